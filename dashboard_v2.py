@@ -7,9 +7,11 @@ It creates and starts the Dash application server.
 """
 
 from src.app import create_app
+from src.utils.helpers import configure_logging
 
 def main():
     """Main entry point when running as a script"""
+    configure_logging()
     app = create_app()
     app.run(debug=True, port=8050)
 
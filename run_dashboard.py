@@ -14,9 +14,11 @@ if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
 from src.app import create_app
+from src.utils.helpers import configure_logging
 
 def main():
     """Create and run the budget dashboard application"""
+    configure_logging()
     app = create_app()
     app.run(debug=True, port=8050)
 
@@ -2,9 +2,27 @@ import os
 import subprocess
 import sys
 import argparse
+import asyncio
 import shutil
 from pathlib import Path
 
+# Minimum pip version; older versions are upgraded before installing packages
+MIN_PIP_VERSION = (23, 0)
+
+# Packages installed into the virtual environment
+DEPENDENCIES = (
+    "pandas",
+    "numpy",
+    "plotly",
+    "dash>=2.16.0",  # running= on regular callbacks needs Dash 2.16
+    "dash-bootstrap-components",
+    "xlrd==1.2.0",  # Specific version for Excel compatibility
+    "openpyxl",
+    "flask>=2.0.0",  # Required for file upload handling
+    "werkzeug>=2.0.0",  # Required for file processing
+    "orjson>=3.6.0"  # Faster JSON serialization of callback data
+)
+
 def print_step(message):
     """Print a step message with formatting"""
     print(f"\n\033[1;34m===> {message}\033[0m")
@@ -42,6 +60,23 @@ def create_virtual_environment(venv_dir):
     # Create venv
     return run_command([sys.executable, "-m", "venv", venv_dir])
 
+def pip_is_recent(pip_path):
+    """Check if the installed pip meets MIN_PIP_VERSION"""
+    try:
+        result = subprocess.run([pip_path, "--version"], capture_output=True, text=True)
+    except OSError:
+        return False
+    if result.returncode != 0:
+        return False
+    
+    # Output looks like "pip 23.3.1 from /path/to/pip (python 3.11)"
+    try:
+        version = tuple(int(part) for part in result.stdout.split()[1].split('.')[:2])
+    except (IndexError, ValueError):
+        return False
+    
+    return version >= MIN_PIP_VERSION
+
 def install_dependencies(venv_dir):
     """Install required packages"""
     print_step("Installing dependencies...")
@@ -52,23 +87,14 @@ def install_dependencies(venv_dir):
     else:
         pip_path = os.path.join(venv_dir, 'bin', 'pip')
     
-    # Upgrade pip
-    run_command([pip_path, "install", "--upgrade", "pip"])
+    # Upgrade pip only if it's too old
+    if pip_is_recent(pip_path):
+        print("pip is up to date, skipping upgrade")
+    else:
+        run_command([pip_path, "install", "--upgrade", "pip"])
     
     # Install dependencies
-    dependencies = [
-        "pandas",
-        "numpy",
-        "plotly",
-        "dash>=2.0.0",  # Ensure we have a recent version of Dash
-        "dash-bootstrap-components",
-        "xlrd==1.2.0",  # Specific version for Excel compatibility
-        "openpyxl",
-        "flask>=2.0.0",  # Required for file upload handling
-        "werkzeug>=2.0.0"  # Required for file processing
-    ]
-    
-    return run_command([pip_path, "install"] + dependencies)
+    return run_command([pip_path, "install", *DEPENDENCIES])
 
 def copy_sample_data(source_dir, data_dir):
     """Copy sample Excel files to data directory"""
@@ -101,18 +127,22 @@ def create_launcher_script(venv_dir, app_dir):
     if sys.platform == 'win32':
         # Windows batch script
         launcher_path = os.path.join(app_dir, 'run_dashboard.bat')
-        with open(launcher_path, 'w') as f:
-            f.write('@echo off\n')
-            f.write(f'call "{os.path.join(venv_dir, "Scripts", "activate.bat")}"\n')
-            f.write(f'python "{os.path.join(app_dir, "dashboard.py")}"\n')
-            f.write('pause\n')
+        content = (
+            '@echo off\n'
+            f'call "{os.path.join(venv_dir, "Scripts", "activate.bat")}"\n'
+            f'python "{os.path.join(app_dir, "dashboard.py")}"\n'
+            'pause\n'
+        )
+        Path(launcher_path).write_text(content, encoding='utf-8')
     else:
         # Unix shell script
         launcher_path = os.path.join(app_dir, 'run_dashboard.sh')
-        with open(launcher_path, 'w') as f:
-            f.write('#!/bin/bash\n')
-            f.write(f'source "{os.path.join(venv_dir, "bin", "activate")}"\n')
-            f.write(f'python "{os.path.join(app_dir, "dashboard.py")}"\n')
+        content = (
+            '#!/bin/bash\n'
+            f'source "{os.path.join(venv_dir, "bin", "activate")}"\n'
+            f'python "{os.path.join(app_dir, "dashboard.py")}"\n'
+        )
+        Path(launcher_path).write_text(content, encoding='utf-8')
         
         # Make executable
         os.chmod(launcher_path, 0o755)
@@ -165,6 +195,13 @@ def setup_desktop_shortcut(app_dir):
         print(f"Created desktop shortcut: {shortcut_path}")
         return True
 
+async def install_and_copy(venv_dir, source_dir, data_dir):
+    """Install dependencies while copying sample data in a worker thread"""
+    loop = asyncio.get_running_loop()
+    install_task = loop.run_in_executor(None, install_dependencies, venv_dir)
+    copy_task = loop.run_in_executor(None, copy_sample_data, source_dir, data_dir)
+    return await asyncio.gather(install_task, copy_task)
+
 def main():
     """Main setup function"""
     parser = argparse.ArgumentParser(description='Setup Budget Dashboard')
@@ -192,14 +229,15 @@ def main():
         print("Failed to create virtual environment")
         return 1
     
-    # Install dependencies
-    if not install_dependencies(venv_dir):
+    # Install dependencies and copy sample data in parallel
+    source_dir = args.data_source if args.data_source else os.path.dirname(app_dir)
+    installed, copied = asyncio.run(install_and_copy(venv_dir, source_dir, data_dir))
+    
+    if not installed:
         print("Failed to install dependencies")
         return 1
     
-    # Copy sample data
-    source_dir = args.data_source if args.data_source else os.path.dirname(app_dir)
-    if not copy_sample_data(source_dir, data_dir):
+    if not copied:
         print("Warning: Failed to copy sample data files")
     
     # Create launcher script
@@ -7,14 +7,15 @@ import flask
 from dash import html, dcc, callback_context
 import os
 
-from .data.loader import load_data, get_data_dir, get_template_path, month_names
+from .data.loader import load_data, get_data_dir, get_template_path
+from .utils.helpers import configure_logging
 from .layouts.main_layout import create_layout
 from .callbacks.dashboard_callbacks import register_callbacks
 
 def create_app():
     """Create and configure the Dash application"""
     # Load the data
-    summary_df, all_transactions_df, category_monthly_df = load_data()
+    data = load_data()
     
     # Initialize the Dash app with callback exceptions suppressed
     app = dash.Dash(
@@ -24,7 +25,7 @@ def create_app():
     )
     
     # Set app layout
-    app.layout = create_layout(summary_df, all_transactions_df, category_monthly_df, month_names)
+    app.layout = create_layout(data.summary_df, data.transactions_df, data.category_df, data.month_names, data.errors)
     
     # Register callbacks
     register_callbacks(app)
@@ -72,5 +73,6 @@ def create_app():
     return app
 
 if __name__ == '__main__':
+    configure_logging()
     app = create_app()
     app.run(debug=True, port=8050)
\ No newline at end of file
@@ -0,0 +1,135 @@
+/*
+ * Clientside chart builders for the budget dashboard
+ *
+ * Each function takes the records in summary-store and the graph's current
+ * figure, and returns the new figure. The current figure's template is
+ * reused so the charts look the same as the ones built with plotly.py.
+ * Once a chart has been drawn, later updates only replace its data arrays,
+ * and leave the chart alone if the records didn't change.
+ */
+(function() {
+    var AMOUNT_TITLE = 'Amount (₹)';
+
+    function templateOf(figure) {
+        return figure && figure.layout ? figure.layout.template : undefined;
+    }
+
+    function column(records, key) {
+        return records.map(function(record) { return record[key]; });
+    }
+
+    function emptyFigure(title, figure) {
+        return {data: [], layout: {template: templateOf(figure), title: {text: title}}};
+    }
+
+    function sameValues(a, b) {
+        if (!a || !b || a.length !== b.length) {
+            return false;
+        }
+        for (var i = 0; i < a.length; i++) {
+            if (a[i] !== b[i]) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    // Update the x/y arrays of a figure already built from summary records,
+    // keeping its layout and trace styling so plotly only restyles the data.
+    // Returns undefined if the figure doesn't have the expected traces yet.
+    function updateTraces(figure, records, keys) {
+        if (!records || records.length === 0 || !figure || !figure.data || figure.data.length !== keys.length) {
+            return undefined;
+        }
+        var months = column(records, 'Month');
+        var values = keys.map(function(key) { return column(records, key); });
+        var unchanged = figure.data.every(function(trace, i) {
+            return sameValues(trace.x, months) && sameValues(trace.y, values[i]);
+        });
+        if (unchanged) {
+            return window.dash_clientside.no_update;
+        }
+        return {
+            data: figure.data.map(function(trace, i) {
+                return Object.assign({}, trace, {x: months, y: values[i]});
+            }),
+            layout: figure.layout
+        };
+    }
+
+    function lineFigure(records, key, title, figure) {
+        var updated = updateTraces(figure, records, [key]);
+        if (updated !== undefined) {
+            return updated;
+        }
+        if (!records || records.length === 0) {
+            return emptyFigure('No monthly data available', figure);
+        }
+        // WebGL keeps the line charts responsive once multi-year data
+        // puts many months on them
+        return {
+            data: [{
+                type: 'scattergl',
+                mode: 'lines+markers',
+                x: column(records, 'Month'),
+                y: column(records, key),
+                hovertemplate: 'Month=%{x}<br>' + AMOUNT_TITLE + '=%{y}<extra></extra>'
+            }],
+            layout: {
+                template: templateOf(figure),
+                title: {text: title},
+                xaxis: {title: {text: 'Month'}},
+                yaxis: {title: {text: AMOUNT_TITLE}}
+            }
+        };
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        charts: {
+            monthlyOverview: function(records, figure) {
+                var series = [
+                    ['Total Income', 'green'],
+                    ['Total Expenses', 'red'],
+                    ['Investments', 'blue']
+                ];
+                var updated = updateTraces(figure, records, series.map(function(item) { return item[0]; }));
+                if (updated !== undefined) {
+                    return updated;
+                }
+                if (!records || records.length === 0) {
+                    return emptyFigure('No monthly data available', figure);
+                }
+                var months = column(records, 'Month');
+                return {
+                    data: series.map(function(item) {
+                        return {
+                            type: 'bar',
+                            name: item[0],
+                            legendgroup: item[0],
+                            marker: {color: item[1]},
+                            x: months,
+                            y: column(records, item[0]),
+                            hovertemplate: 'Type=' + item[0] + '<br>Month=%{x}<br>' + AMOUNT_TITLE + '=%{y}<extra></extra>'
+                        };
+                    }),
+                    layout: {
+                        template: templateOf(figure),
+                        title: {text: 'Monthly Financial Overview'},
+                        barmode: 'group',
+                        legend: {title: {text: 'Type'}},
+                        xaxis: {title: {text: 'Month'}},
+                        yaxis: {title: {text: AMOUNT_TITLE}}
+                    }
+                };
+            },
+
+            monthlySurplus: function(records, figure) {
+                return lineFigure(records, 'Surplus', 'Monthly Surplus Trend', figure);
+            },
+
+            monthlyInvestments: function(records, figure) {
+                return lineFigure(records, 'Investments', 'Monthly Investments Trend', figure);
+            }
+        }
+    });
+})();
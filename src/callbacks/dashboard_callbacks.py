@@ -1,27 +1,158 @@
 """
 Callbacks for the budget dashboard
 """
+from collections import namedtuple
+
+import numpy as np
 import pandas as pd
 import plotly.express as px
-from dash import html, dcc, dash_table, callback, Output, Input, State, no_update, dash
+import plotly.graph_objects as go
+from dash import html, dcc, dash_table, callback, ClientsideFunction, Output, Input, State, no_update, dash
 import dash_bootstrap_components as dbc
 from datetime import datetime
 import os
 
 from ..data.loader import (
     get_excel_files, has_excel_files, load_data,
-    process_upload, get_data_dir, months, month_names
+    process_upload, get_data_dir
+)
+from ..components.charts import create_chart_patch, create_empty_figure, create_grouped_figure
+from ..data.transactions import (
+    prepare_transactions, get_transaction_aggregates,
+    largest_rows, largest_index, write_transactions_csv, get_column_signature,
+    transactions_to_store, store_to_transactions
 )
 from ..utils.helpers import format_inr
 
+# Maximum number of transactions plotted in the daily spending scatter
+MAX_SCATTER_POINTS = 5000
+
+# Freshly reloaded data and the values shown in the summary cards
+ReloadSummary = namedtuple('ReloadSummary', [
+    'transactions_data', 'summary_data', 'ytd', 'displays',
+    'month_count', 'file_count', 'has_files'
+])
+
+def chart_data_unchanged(signatures, chart_id, aggs, columns):
+    """
+    Check whether the columns a chart depends on are unchanged since its last update
+    
+    signatures comes from the page's chart-signatures-store, so each browser
+    tab compares against the charts it drew itself. A newly loaded page
+    starts with an empty store and draws every chart.
+    
+    Args:
+        signatures: Dict of chart ID to the signature it was last drawn
+            from; updated in place
+        chart_id: ID of the chart's graph component
+        aggs: A SimpleNamespace from get_transaction_aggregates
+        columns: Columns the chart uses
+    
+    Returns:
+        True if the chart can be left as it is
+    """
+    # repr keeps the signature a string, since the 64-bit hash would lose
+    # precision as a JSON number in the browser
+    signature = repr(get_column_signature(aggs, columns))
+    unchanged = signatures.get(chart_id) == signature
+    signatures[chart_id] = signature
+    return unchanged
+
+def reload_and_summarize():
+    """
+    Reload all data from the Excel files and compute the summary card values
+    
+    Shared by the refresh and upload callbacks, which show the same cards.
+    
+    Returns:
+        A ReloadSummary. ytd holds the (income, expenses, investments,
+        surplus) totals and displays the formatted values in the order of
+        the card outputs: the four YTD totals, the four monthly averages,
+        monthly needs and the emergency fund suggestion.
+    """
+    data = load_data()
+    summary_df, all_transactions_df = data.summary_df, data.transactions_df
+    
+    # Work on the plain month x total array; the summary has one row per
+    # month, and summing no rows gives zeros
+    monthly_totals = summary_df[['Total Income', 'Total Expenses', 'Investments', 'Surplus']].to_numpy(dtype=float)
+    
+    # Calculate YTD values freshly
+    ytd = tuple(monthly_totals.sum(axis=0).tolist())
+    ytd_income, ytd_expenses, ytd_investments, ytd_surplus = ytd
+    
+    # Calculate monthly averages
+    month_count = monthly_totals.shape[0]
+    averages = tuple(total / max(1, month_count) for total in ytd)
+    
+    # Calculate monthly needs, by default 50% of expenses
+    avg_monthly_needs = averages[1] * 0.5
+    
+    # If we have labeled data, calculate based on actual "Needs" transactions
+    if not all_transactions_df.empty and 'Label' in all_transactions_df.columns:
+        needs_transactions = all_transactions_df[all_transactions_df['Label'] == 'Needs']
+        
+        if not needs_transactions.empty:
+            # Amount is already numeric (see load_data)
+            monthly_needs = needs_transactions.groupby('Month', observed=True, sort=False)['Amount'].sum()
+            
+            # Calculate the average of monthly needs (average across months)
+            if len(monthly_needs) > 0:
+                avg_monthly_needs = monthly_needs.mean()
+    
+    # Calculate emergency fund suggestion (6 times monthly needs)
+    emergency_fund_suggestion = avg_monthly_needs * 6
+    
+    print(f"Data reload complete. YTD Income: {ytd_income}, YTD Expenses: {ytd_expenses}, YTD Investments: {ytd_investments}, YTD Surplus: {ytd_surplus}")
+    print(f"Monthly needs: {avg_monthly_needs}, emergency fund suggestion: {emergency_fund_suggestion}")
+    
+    excel_files, _ = get_excel_files()
+    
+    return ReloadSummary(
+        transactions_data=transactions_to_store(all_transactions_df),
+        summary_data=summary_df.to_dict('records'),
+        ytd=ytd,
+        displays=tuple(format_inr(value) for value in (*ytd, *averages, avg_monthly_needs, emergency_fund_suggestion)),
+        month_count=month_count,
+        file_count=len(excel_files),
+        has_files=has_excel_files()
+    )
+
+def dashboard_state(has_files, displays=None):
+    """
+    Build the dashboard-state store data after a refresh or upload
+    
+    Args:
+        has_files: Whether the data directory has any Excel files
+        displays: Optional card values, as in ReloadSummary.displays; the
+            cards are left as they are if not given
+    
+    Returns:
+        A dict with the dashboard and no-files message styles and the card values
+    """
+    return {
+        'dashboard_style': {'display': 'block'} if has_files else {'display': 'none'},
+        'no_files_style': {'display': 'none'} if has_files else {'display': 'block', 'marginTop': '20px'},
+        'cards': list(displays) if displays is not None else None
+    }
+
 def register_callbacks(app):
     """Register all callbacks for the dashboard application"""
     
-    # Import data loading functions
-    from ..data.loader import load_data, months, month_names
-    
     # Load data initially
-    summary_df, all_transactions_df, category_monthly_df = load_data()
+    data = load_data()
+    all_transactions_df, category_monthly_df, month_names = data.transactions_df, data.category_df, data.month_names
+    
+    # Coerce dtypes once so callbacks can filter without copying or converting
+    all_transactions_df = prepare_transactions(all_transactions_df)
+    
+    # Precompute expense totals (excluding investments) for the month and
+    # category charts, which only ever look at this initial data
+    valid_transactions_df = all_transactions_df[all_transactions_df['Amount'].notna()]
+    regular_expenses_df = valid_transactions_df[~valid_transactions_df['IsInvestment']]
+    months_with_data = set(valid_transactions_df['Month'])
+    month_category_expenses = regular_expenses_df.groupby(['Month', 'Category'], observed=True)['Amount'].sum().reset_index()
+    category_expense_totals = regular_expenses_df.groupby('Category', observed=True)['Amount'].sum().reset_index()
     
     @app.callback(
         Output('category-pie-chart', 'figure'),
@@ -29,37 +160,26 @@ def register_callbacks(app):
     )
     def update_pie_chart(selected_month):
         """Update the category pie chart based on selected month"""
-        # Filter transactions for the selected month
-        month_data = all_transactions_df[all_transactions_df['Month'] == selected_month].copy()
-        
-        # Ensure Amount is numeric
-        month_data['Amount'] = pd.to_numeric(month_data['Amount'], errors='coerce')
-        month_data = month_data.dropna(subset=['Amount'])  # Drop rows where Amount couldn't be converted
-        
         # Check if we have any data to work with
-        if month_data.empty:
-            return px.pie(title=f"No transaction data for {selected_month}")
+        if selected_month not in months_with_data:
+            return create_chart_patch([{'type': 'pie'}], f"No transaction data for {selected_month}")
         
-        # Exclude investment categories
-        investment_mask = month_data['Category'].astype(str).str.startswith('Investment')
-        regular_expense_data = month_data[~investment_mask]
+        # Get the precomputed category totals for the month (excluding investments)
+        category_expenses = month_category_expenses[month_category_expenses['Month'] == selected_month]
         
         # Check if we have expense data after filtering
-        if regular_expense_data.empty:
-            return px.pie(title=f"No expense data for {selected_month} (excluding investments)")
-        
-        # Group by category
-        category_expenses = regular_expense_data.groupby('Category')['Amount'].sum().reset_index()
-        
-        # Create pie chart
-        fig = px.pie(
-            category_expenses,
-            values='Amount',
-            names='Category',
-            title=f"Expense Categories for {selected_month} (Excluding Investments)"
+        if category_expenses.empty:
+            return create_chart_patch([{'type': 'pie'}], f"No expense data for {selected_month} (excluding investments)")
+        
+        # Create pie chart and send only its traces and title
+        trace = go.Pie(
+            labels=category_expenses['Category'].to_numpy(),
+            values=category_expenses['Amount'].to_numpy(),
+            textposition='inside',
+            textinfo='percent+label',
+            hovertemplate='Category=%{label}<br>Amount=%{value}<extra></extra>'
         )
-        fig.update_traces(textposition='inside', textinfo='percent+label')
-        return fig
+        return create_chart_patch([trace], f"Expense Categories for {selected_month} (Excluding Investments)")
     
     @app.callback(
         Output('category-trend-chart', 'figure'),
@@ -86,18 +206,10 @@ def register_callbacks(app):
                 trend_data = trend_data.fillna(0)  # Fill NaN values with zero for this chart
                 
                 # Create line chart
-                fig = px.line(
-                    trend_data,
-                    x='Month',
-                    y='Amount',
-                    title=f"{selected_category} Expenses Over Time",
-                    markers=True
-                )
-                fig.update_layout(yaxis_title="Amount (₹)")
-                return fig
+                return create_grouped_figure(trend_data, 'Month', 'Amount', 'line', f"{selected_category} Expenses Over Time")
         
         # Fallback empty chart
-        return px.line(title="Select a category to see trend")
+        return create_empty_figure('line', "Select a category to see trend")
     
     @app.callback(
         Output('top-categories-chart', 'figure'),
@@ -105,40 +217,26 @@ def register_callbacks(app):
     )
     def update_top_categories(_):
         """Update the top categories chart"""
-        # Make a copy to avoid modifying the original
-        expense_data = all_transactions_df.copy()
-        
-        # Ensure Amount is numeric
-        expense_data['Amount'] = pd.to_numeric(expense_data['Amount'], errors='coerce')
-        expense_data = expense_data.dropna(subset=['Amount'])  # Drop rows where Amount couldn't be converted
-        
-        # Filter out investment categories
-        investment_mask = expense_data['Category'].astype(str).str.startswith('Investment')
-        regular_expense_data = expense_data[~investment_mask]
+        if regular_expenses_df.empty:
+            return create_chart_patch([], "No expense data available")
         
-        if regular_expense_data.empty:
-            return px.bar(title="No expense data available")
-        
-        # Get overall expenses by category
-        category_totals = regular_expense_data.groupby('Category')['Amount'].sum().reset_index()
+        # Get overall expenses by category (excluding investments)
+        category_totals = category_expense_totals
         
         # Make sure we have categories to display
         if len(category_totals) == 0:
-            return px.bar(title="No categories found")
+            return create_chart_patch([], "No categories found")
         
-        # Sort and take top 10
-        category_totals = category_totals.sort_values('Amount', ascending=False)
-        category_totals = category_totals.head(min(10, len(category_totals)))
+        # Take top 10, largest first
+        category_totals = largest_rows(category_totals, 'Amount', 10)
         
-        # Create bar chart
-        fig = px.bar(
-            category_totals,
-            x='Category',
-            y='Amount',
-            title="Top 10 Expense Categories (All Months, Excluding Investments)",
-            labels={'Amount': 'Amount (₹)'}
+        # Create bar chart and send only its traces and title
+        trace = go.Bar(
+            x=category_totals['Category'].to_numpy(),
+            y=category_totals['Amount'].to_numpy(),
+            hovertemplate='Category=%{x}<br>Amount (₹)=%{y}<extra></extra>'
         )
-        return fig
+        return create_chart_patch([trace], "Top 10 Expense Categories (All Months, Excluding Investments)")
     
     @app.callback(
         Output('transactions-table', 'children'),
@@ -150,26 +248,25 @@ def register_callbacks(app):
     )
     def update_transactions_table(selected_month, selected_category, selected_person):
         """Update the transactions table based on filters"""
-        # Start with all transactions
-        filtered_df = all_transactions_df.copy()
+        # Build one mask for all filters so the data is only copied once
+        mask = np.ones(len(all_transactions_df), dtype=bool)
         
-        # Apply filters
         if selected_month != 'all':
-            filtered_df = filtered_df[filtered_df['Month'] == selected_month]
+            mask &= np.asarray(all_transactions_df['Month'] == selected_month)
             
         if selected_category != 'all':
-            filtered_df = filtered_df[filtered_df['Category'] == selected_category]
+            mask &= np.asarray(all_transactions_df['Category'] == selected_category)
             
         if selected_person != 'all':
-            filtered_df = filtered_df[filtered_df['Who'] == selected_person]
+            mask &= np.asarray(all_transactions_df['Who'] == selected_person)
+        
+        filtered_df = all_transactions_df[mask]
         
         # Ensure Date column exists and convert to datetime for consistent sorting
         if 'Date' in filtered_df.columns and not filtered_df.empty:
             # Convert string dates to datetime
             try:
-                # First try to convert using pandas to_datetime
-                filtered_df['Date'] = pd.to_datetime(filtered_df['Date'], errors='coerce')
-                # Sort by date (handling NaT values)
+                # Dates are already datetime64; sort by date (handling NaT values)
                 filtered_df = filtered_df.sort_values('Date', ascending=False, na_position='last')
             except Exception as e:
                 print(f"Error sorting by date: {e}")
@@ -177,12 +274,15 @@ def register_callbacks(app):
         else:
             # Sort by Month if Date is not available
             if 'Month' in filtered_df.columns:
-                # Use a month order mapping for proper sorting
-                month_order = {month: i for i, month in enumerate(month_names)}
-                filtered_df['MonthOrder'] = filtered_df['Month'].map(month_order)
-                filtered_df = filtered_df.sort_values('MonthOrder', ascending=False)
-                if 'MonthOrder' in filtered_df.columns:
-                    filtered_df = filtered_df.drop('MonthOrder', axis=1)
+                # Month is an ordered categorical, so this sorts chronologically
+                filtered_df = filtered_df.sort_values('Month', ascending=False)
+        
+        # IsInvestment is only used internally
+        filtered_df = filtered_df.drop(columns=['IsInvestment'], errors='ignore')
+        
+        # Format dates once here rather than sending a Timestamp per row
+        if 'Date' in filtered_df.columns:
+            filtered_df = filtered_df.assign(Date=filtered_df['Date'].dt.strftime('%Y-%m-%d'))
         
         # Create DataTable
         if not filtered_df.empty:
@@ -237,33 +337,65 @@ def register_callbacks(app):
         else:
             return html.Div("No transactions match the selected filters.", className="text-center m-5")
     
-    # Callback for the editable labels datatable
-    @app.callback(
+    # Callback for the editable labels datatable. The store already lives in
+    # the browser, so filter and sort it there instead of sending it to the
+    # server and back. Date strings are kept exactly as they are in the
+    # store since update_labels matches rows back on them.
+    app.clientside_callback(
+        """
+        function(selectedMonth, transactionsData) {
+            var columns = transactionsData ? transactionsData.columns : [];
+            var rows = (transactionsData ? transactionsData.data : []).map(function(values) {
+                var row = {};
+                columns.forEach(function(column, i) { row[column] = values[i]; });
+                return row;
+            });
+            if (selectedMonth !== 'all') {
+                rows = rows.filter(function(row) { return row.Month === selectedMonth; });
+            }
+            // Sort by date, newest first, with missing or invalid dates last
+            var dated = rows.map(function(row) {
+                return {row: row, time: row.Date == null ? NaN : Date.parse(row.Date)};
+            });
+            dated.sort(function(a, b) {
+                if (isNaN(a.time)) { return isNaN(b.time) ? 0 : 1; }
+                if (isNaN(b.time)) { return -1; }
+                return b.time - a.time;
+            });
+            return dated.map(function(item) { return item.row; });
+        }
+        """,
         Output('label-transactions-table', 'data'),
         Input('label-month-dropdown', 'value'),
         State('transactions-store', 'data')
     )
-    def filter_label_table(selected_month, transactions_data):
-        """Filter the label transactions table based on selected month"""
-        df = pd.DataFrame(transactions_data)
-        
-        if selected_month != 'all':
-            df = df[df['Month'] == selected_month]
-        
-        # Ensure dates are properly formatted before returning
-        if 'Date' in df.columns and not df.empty:
-            try:
-                # Convert any string dates to datetime for consistent display
-                df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-                # Sort by date
-                df = df.sort_values('Date', ascending=False, na_position='last')
-            except Exception as e:
-                print(f"Error processing dates in label table: {e}")
-        
-        return df.to_dict('records')
     
-    # Callback for bulk label application
-    @app.callback(
+    # Callback for bulk label application, also run in the browser
+    app.clientside_callback(
+        """
+        function(nClicks, category, label, transactionsData) {
+            if (nClicks == null || category == null || label == null || !transactionsData) {
+                return transactionsData;
+            }
+            var categoryIndex = transactionsData.columns.indexOf('Category');
+            var labelIndex = transactionsData.columns.indexOf('Label');
+            if (categoryIndex < 0 || labelIndex < 0) {
+                return transactionsData;
+            }
+            // Apply the label to all transactions with the selected category
+            return {
+                columns: transactionsData.columns,
+                data: transactionsData.data.map(function(values) {
+                    if (values[categoryIndex] !== category) {
+                        return values;
+                    }
+                    var updated = values.slice();
+                    updated[labelIndex] = label;
+                    return updated;
+                })
+            };
+        }
+        """,
         Output('transactions-store', 'data'),
         Input('apply-bulk-label', 'n_clicks'),
         State('bulk-category-dropdown', 'value'),
@@ -271,17 +403,6 @@ def register_callbacks(app):
         State('transactions-store', 'data'),
         prevent_initial_call=True
     )
-    def apply_bulk_label(n_clicks, category, label, transactions_data):
-        """Apply bulk label to transactions"""
-        if n_clicks is None or category is None or label is None:
-            return transactions_data
-        
-        df = pd.DataFrame(transactions_data)
-        
-        # Apply the label to all transactions with the selected category
-        df.loc[df['Category'] == category, 'Label'] = label
-        
-        return df.to_dict('records')
     
     # Callback to update labels from the label table
     @app.callback(
@@ -292,26 +413,26 @@ def register_callbacks(app):
     )
     def update_labels(table_data, store_data):
         """Update labels from the table to the store"""
-        if not table_data:
+        if not table_data or not store_data or 'Label' not in store_data['columns']:
             return store_data
         
-        table_df = pd.DataFrame(table_data)
-        store_df = pd.DataFrame(store_data)
+        # Match rows on multiple columns to ensure uniqueness; if the table
+        # has the same key more than once, the last row wins
+        key_columns = ('Date', 'Description', 'Amount', 'Who')
+        table_labels = {tuple(row.get(col) for col in key_columns): row.get('Label') for row in table_data}
         
-        # For each row in table_data, update the corresponding row in store_data
-        for _, row in table_df.iterrows():
-            # Find matching row(s) in store_df
-            # Need to match on multiple columns to ensure uniqueness
-            mask = (store_df['Date'] == row['Date']) & \
-                   (store_df['Description'] == row['Description']) & \
-                   (store_df['Amount'] == row['Amount']) & \
-                   (store_df['Who'] == row['Who'])
-            
-            # Update the Label column for matching rows
-            if any(mask):
-                store_df.loc[mask, 'Label'] = row['Label']
+        # Store rows are lists in column order
+        columns = store_data['columns']
+        key_positions = [columns.index(col) if col in columns else None for col in key_columns]
+        label_position = columns.index('Label')
         
-        return store_df.to_dict('records')
+        # Update the Label for matching rows in the store
+        for values in store_data['data']:
+            key = tuple(values[pos] if pos is not None else None for pos in key_positions)
+            if key in table_labels:
+                values[label_position] = table_labels[key]
+        
+        return store_data
     
     # Callback to display save status
     @app.callback(
@@ -327,12 +448,12 @@ def register_callbacks(app):
         
         try:
             # Update all_transactions_df with the labeled data
-            df = pd.DataFrame(transactions_data)
+            df = store_to_transactions(transactions_data)
             
             # Get the data directory and save CSV there
             data_dir = get_data_dir()
             csv_path = os.path.join(data_dir, 'labeled_transactions.csv')
-            df.to_csv(csv_path, index=False)
+            write_transactions_csv(df, csv_path)
             
             # Map full labels back to short codes for Excel
             label_to_code = {
@@ -343,16 +464,17 @@ def register_callbacks(app):
                 'Investment': 'I'
             }
             
-            # Count labeled transactions by type
+            # Count labeled transactions by type in a single pass
+            counts = df['Label'].value_counts()
             label_counts = {}
             for label in ['Needs', 'Wants', 'Luxury', 'Savings', 'Investment']:
-                count = len(df[df['Label'] == label])
+                count = int(counts.get(label, 0))
                 if count > 0:
                     label_counts[label] = count
             
             # Count labeled transactions
-            labeled_count = len(df[df['Label'] != ''])
             total_count = len(df)
+            labeled_count = total_count - int(counts.get('', 0))
             
             # Calculate percentages
             label_percentages = {}
@@ -401,389 +523,293 @@ def register_callbacks(app):
                 html.P(error_msg)
             ], style={'backgroundColor': '#fff3f3', 'padding': '15px', 'borderRadius': '5px'})
     
-    # Callbacks for spending patterns
-    @app.callback(
-        Output('spending-by-person-chart', 'figure'),
-        Input('transactions-store', 'data')
-    )
-    def update_spending_by_person(transactions_data):
+    # Charts for spending patterns
+    def update_spending_by_person(aggs, signatures):
         """Update spending by person chart"""
-        df = pd.DataFrame(transactions_data)
-        
-        if df.empty or 'Who' not in df.columns:
-            return px.pie(title="No person data available")
-        
-        # Group by Who
-        person_expenses = df.groupby('Who')['Amount'].sum().reset_index()
-        
-        # Create pie chart
-        fig = px.pie(
-            person_expenses,
-            values='Amount',
-            names='Who',
-            title="Expenses by Person"
+        if chart_data_unchanged(signatures, 'spending-by-person-chart', aggs, ['Who', 'Amount']):
+            return no_update
+        
+        if aggs.df.empty or 'Who' not in aggs.df.columns:
+            return create_empty_figure('pie', "No person data available")
+        
+        # Create pie chart from the precomputed totals by person
+        fig = go.Figure(
+            go.Pie(
+                labels=aggs.by_person['Who'].to_numpy(),
+                values=aggs.by_person['Amount'].to_numpy(),
+                hovertemplate='Who=%{label}<br>Amount=%{value}<extra></extra>'
+            ),
+            layout={'title': "Expenses by Person"}
         )
         return fig
     
-    @app.callback(
-        Output('spending-trends-by-person-chart', 'figure'),
-        Input('transactions-store', 'data')
-    )
-    def update_spending_trends_by_person(transactions_data):
+    def update_spending_trends_by_person(aggs, signatures):
         """Update spending trends by person chart"""
-        df = pd.DataFrame(transactions_data)
-        
-        if df.empty or 'Who' not in df.columns:
-            return px.line(title="No person data available")
+        if chart_data_unchanged(signatures, 'spending-trends-by-person-chart', aggs, ['Month', 'Who', 'Amount']):
+            return no_update
         
-        # Group by Month and Who
-        monthly_person_expenses = df.groupby(['Month', 'Who'])['Amount'].sum().reset_index()
+        if aggs.df.empty or 'Who' not in aggs.df.columns:
+            return create_empty_figure('line', "No person data available")
         
-        # Create line chart
-        fig = px.line(
-            monthly_person_expenses,
-            x='Month',
-            y='Amount',
-            color='Who',
-            title="Monthly Spending by Person",
-            markers=True
-        )
-        fig.update_layout(yaxis_title="Amount (₹)")
-        return fig
+        # Create line chart from the precomputed totals by month and person
+        return create_grouped_figure(aggs.by_month_person, 'Month', 'Amount', 'line', "Monthly Spending by Person", color='Who')
     
-    @app.callback(
-        Output('daily-spending-pattern-chart', 'figure'),
-        Input('transactions-store', 'data')
-    )
-    def update_daily_spending_pattern(transactions_data):
+    def update_daily_spending_pattern(aggs, signatures):
         """Update daily spending pattern chart"""
-        df = pd.DataFrame(transactions_data)
+        df = aggs.df
         
-        if df.empty:
-            return px.scatter(title="No transaction data available")
+        if chart_data_unchanged(signatures, 'daily-spending-pattern-chart', aggs, ['Date', 'Amount', 'Category', 'Description', 'Who']):
+            return no_update
         
-        # Create scatter plot
-        hover_data = ['Description']
+        if df.empty:
+            return create_empty_figure('scatter', "No transaction data available")
+        
+        # With very large stores, plot a random sample of the transactions so
+        # small everyday spending stays as visible as the large purchases;
+        # the fixed seed keeps the chart stable between updates
+        title = "Daily Spending Pattern"
+        if len(df) > MAX_SCATTER_POINTS:
+            title = f"Daily Spending Pattern (sampled {MAX_SCATTER_POINTS:,} of {len(df):,} transactions)"
+            df = df.sample(MAX_SCATTER_POINTS, random_state=0).sort_index()
+        
+        # Scale marker size with the square root of the amount, capped at the
+        # 99th percentile so a few outliers don't produce huge markers
+        amounts = df['Amount'].clip(lower=1, upper=df['Amount'].quantile(0.99))
+        df = df.assign(MarkerSize=np.sqrt(amounts.to_numpy()) * 0.8)
+        
+        # Create scatter plot with a fixed hover format; the category is shown
+        # as the trace name next to the hover label
+        custom_data = ['Description']
+        hovertemplate = '%{x|%Y-%m-%d}<br>₹%{y:,.2f}<br>%{customdata[0]}'
         if 'Who' in df.columns:
-            hover_data.append('Who')
+            custom_data.append('Who')
+            hovertemplate += '<br>%{customdata[1]}'
             
         fig = px.scatter(
             df,
             x='Date',
             y='Amount',
             color='Category',
-            size='Amount',
-            hover_data=hover_data,
-            title="Daily Spending Pattern"
+            size='MarkerSize',
+            size_max=25,
+            custom_data=custom_data,
+            title=title,
+            render_mode='webgl'  # Draw markers with scattergl instead of SVG
         )
+        fig.update_traces(hovertemplate=hovertemplate)
         fig.update_layout(yaxis_title="Amount (₹)")
         return fig
     
-    # Callbacks for the Label Analysis tab
-    @app.callback(
-        Output('label-pie-chart', 'figure'),
-        Input('transactions-store', 'data')
-    )
-    def update_label_pie_chart(transactions_data):
+    # Charts for the Label Analysis tab
+    def update_label_pie_chart(aggs, signatures):
         """Update the label pie chart"""
-        df = pd.DataFrame(transactions_data)
+        if chart_data_unchanged(signatures, 'label-pie-chart', aggs, ['Label', 'Amount']):
+            return no_update
         
         # Check if Label column exists
-        if 'Label' not in df.columns:
-            return px.pie(title="No label data available")
+        if 'Label' not in aggs.df.columns:
+            return create_empty_figure('pie', "No label data available")
         
-        # Skip empty labels
-        df = df[df['Label'].notna() & (df['Label'] != '')]
+        if not aggs.has_labeled:
+            return create_empty_figure('pie', "No labeled transactions")
         
-        if df.empty:
-            return px.pie(title="No labeled transactions")
-        
-        # Ensure Amount is numeric
-        df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce')
-        df = df.dropna(subset=['Amount'])  # Drop rows where Amount couldn't be converted
-        
-        if df.empty:
-            return px.pie(title="No valid transaction amounts")
-        
-        # Group by label
-        label_expenses = df.groupby('Label')['Amount'].sum().reset_index()
+        # Totals only include rows with a valid Amount
+        if aggs.by_label.empty:
+            return create_empty_figure('pie', "No valid transaction amounts")
         
         # Create pie chart
-        fig = px.pie(
-            label_expenses,
-            values='Amount',
-            names='Label',
-            title="Expense Distribution by Label"
+        fig = go.Figure(
+            go.Pie(
+                labels=aggs.by_label['Label'].to_numpy(),
+                values=aggs.by_label['Amount'].to_numpy(),
+                textposition='inside',
+                textinfo='percent+label',
+                hovertemplate='Label=%{label}<br>Amount=%{value}<extra></extra>'
+            ),
+            layout={'title': "Expense Distribution by Label"}
         )
-        fig.update_traces(textposition='inside', textinfo='percent+label')
         return fig
     
-    @app.callback(
-        Output('label-trend-chart', 'figure'),
-        Input('transactions-store', 'data')
-    )
-    def update_label_trend(transactions_data):
+    def update_label_trend(aggs, signatures):
         """Update the label trend chart"""
-        df = pd.DataFrame(transactions_data)
+        if chart_data_unchanged(signatures, 'label-trend-chart', aggs, ['Month', 'Label', 'Amount']):
+            return no_update
         
         # Check if Label column exists
-        if 'Label' not in df.columns:
-            return px.line(title="No label data available")
-        
-        # Skip empty labels
-        df = df[df['Label'].notna() & (df['Label'] != '')]
+        if 'Label' not in aggs.df.columns:
+            return create_empty_figure('line', "No label data available")
         
-        if df.empty:
-            return px.line(title="No labeled transactions")
-        
-        # Ensure Amount is numeric
-        df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce')
-        df = df.dropna(subset=['Amount'])  # Drop rows where Amount couldn't be converted
-        
-        if df.empty:
-            return px.line(title="No valid transaction amounts")
+        if not aggs.has_labeled:
+            return create_empty_figure('line', "No labeled transactions")
         
-        # Group by month and label
-        monthly_label_expenses = df.groupby(['Month', 'Label'])['Amount'].sum().reset_index()
+        # Totals only include rows with a valid Amount
+        if aggs.by_month_label.empty:
+            return create_empty_figure('line', "No valid transaction amounts")
         
         # Create line chart
-        fig = px.line(
-            monthly_label_expenses,
-            x='Month',
-            y='Amount',
-            color='Label',
-            title="Monthly Expenses by Label",
-            markers=True
-        )
-        fig.update_layout(yaxis_title="Amount (₹)")
-        return fig
+        return create_grouped_figure(aggs.by_month_label, 'Month', 'Amount', 'line', "Monthly Expenses by Label", color='Label')
     
-    @app.callback(
-        Output('label-category-chart', 'figure'),
-        Input('transactions-store', 'data')
-    )
-    def update_label_category_chart(transactions_data):
+    def update_label_category_chart(aggs, signatures):
         """Update the label category chart"""
         try:
-            df = pd.DataFrame(transactions_data)
+            if chart_data_unchanged(signatures, 'label-category-chart', aggs, ['Category', 'Label', 'Amount']):
+                return no_update
             
             # Check if Label column exists
-            if 'Label' not in df.columns:
+            if 'Label' not in aggs.df.columns:
                 print("Label column not found")
-                return px.bar(title="No label data available")
-            
-            # Skip empty labels
-            df = df[df['Label'].notna() & (df['Label'] != '')]
+                return create_empty_figure('bar', "No label data available")
             
-            if df.empty:
+            if not aggs.has_labeled:
                 print("No labeled transactions")
-                return px.bar(title="No labeled transactions")
+                return create_empty_figure('bar', "No labeled transactions")
             
             # Ensure Amount column exists
-            if 'Amount' not in df.columns:
+            if 'Amount' not in aggs.df.columns:
                 print("Amount column not found")
-                return px.bar(title="Amount column not found in data")
-            
-            # Ensure Amount is numeric - convert strings to float
-            df['Amount'] = df['Amount'].astype(float)
+                return create_empty_figure('bar', "Amount column not found in data")
             
-            # Drop any rows with NaN Amount values
-            df = df.dropna(subset=['Amount'])
+            # Totals only include rows with a valid Amount
+            category_label_expenses = aggs.by_category_label
             
-            if df.empty:
+            if category_label_expenses.empty:
                 print("No valid transaction amounts")
-                return px.bar(title="No valid transaction amounts")
+                return create_empty_figure('bar', "No valid transaction amounts")
             
-            # Group by category and label
-            category_label_expenses = df.groupby(['Category', 'Label'])['Amount'].sum().reset_index()
+            # Pivot the Category x Label totals and rank categories by their
+            # row sums rather than grouping the data a second time
+            pivot = category_label_expenses.set_index(['Category', 'Label'])['Amount'].unstack('Label', fill_value=0)
             
-            # Get total amount by category for sorting
-            category_sums = df.groupby('Category')['Amount'].sum().reset_index()
+            # Get top 10 categories by amount (or fewer if there are less than 10)
+            top_categories = largest_index(pivot.sum(axis=1), 10)
             
-            # Sort by amount in descending order
-            sorted_categories = category_sums.sort_values('Amount', ascending=False)
-            
-            # Get top 10 categories (or fewer if there are less than 10)
-            top_count = min(10, len(sorted_categories))
-            top_categories = sorted_categories['Category'].iloc[:top_count].tolist()
-            
-            if not top_categories:
+            if top_categories.empty:
                 print("No categories found")
-                return px.bar(title="No categories found")
+                return create_empty_figure('bar', "No categories found")
             
             # Filter to include only top categories
             filtered_data = category_label_expenses[category_label_expenses['Category'].isin(top_categories)]
             
             if filtered_data.empty:
                 print("No data after filtering")
-                return px.bar(title="No data after filtering")
+                return create_empty_figure('bar', "No data after filtering")
             
             # Create bar chart
-            fig = px.bar(
-                filtered_data,
-                x='Category',
-                y='Amount',
-                color='Label',
-                title="Label Distribution by Top Categories",
-                barmode='stack'
-            )
-            fig.update_layout(yaxis_title="Amount (₹)")
-            return fig
+            return create_grouped_figure(filtered_data, 'Category', 'Amount', 'bar', "Label Distribution by Top Categories", color='Label')
         except Exception as e:
             print(f"Error in label-category-chart: {e}")
-            return px.bar(title=f"Error: {str(e)}")
+            return create_empty_figure('bar', f"Error: {str(e)}")
     
-    # Callbacks for the N/W/L analysis tab
-    @app.callback(
-        Output('nwl-pie-chart', 'figure'),
-        Input('transactions-store', 'data')
-    )
-    def update_nwl_pie_chart(transactions_data):
+    # Charts for the N/W/L analysis tab
+    def update_nwl_pie_chart(aggs, signatures):
         """Update the NWL pie chart"""
         try:
-            df = pd.DataFrame(transactions_data)
+            if chart_data_unchanged(signatures, 'nwl-pie-chart', aggs, ['Label', 'Amount']):
+                return no_update
+            
+            df = aggs.df
             
             # Check if the DataFrame has the required columns
             if df.empty or 'Label' not in df.columns or 'Amount' not in df.columns:
-                return px.pie(title="No data available or missing required columns")
-            
-            # Skip transactions without a label
-            df = df[df['Label'].notna() & (df['Label'] != '')]
+                return create_empty_figure('pie', "No data available or missing required columns")
             
-            if df.empty:
-                return px.pie(title="No labeled transactions")
+            if not aggs.has_labeled:
+                return create_empty_figure('pie', "No labeled transactions")
             
             # Use only Needs, Wants, Luxury labels (not Savings/Investment)
-            nwl_labels = ['Needs', 'Wants', 'Luxury']
-            df = df[df['Label'].isin(nwl_labels)]
+            if not aggs.has_nwl:
+                return create_empty_figure('pie', "No N/W/L transactions found")
             
-            if df.empty:
-                return px.pie(title="No N/W/L transactions found")
+            # Totals only include rows with a valid Amount
+            label_expenses = aggs.nwl_by_label
             
-            # Ensure Amount is numeric
-            df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce')
-            df = df.dropna(subset=['Amount'])  # Drop rows where Amount couldn't be converted
-            
-            if df.empty:
-                return px.pie(title="No valid data after conversion")
-            
-            # Group by label
-            label_expenses = df.groupby('Label')['Amount'].sum().reset_index()
+            if label_expenses.empty:
+                return create_empty_figure('pie', "No valid data after conversion")
             
             # Create pie chart with specific colors
             colors = {'Needs': '#00897B', 'Wants': '#1976D2', 'Luxury': '#E53935'}
             
-            fig = px.pie(
-                label_expenses,
-                values='Amount',
-                names='Label',
-                title="Expense Distribution by Needs, Wants, Luxury",
-                color='Label',
-                color_discrete_map=colors
+            labels = label_expenses['Label'].to_numpy()
+            fig = go.Figure(
+                go.Pie(
+                    labels=labels,
+                    values=label_expenses['Amount'].to_numpy(),
+                    marker={'colors': [colors[label] for label in labels]},
+                    textposition='inside',
+                    textinfo='percent+label',
+                    hovertemplate='Label=%{label}<br>Amount=%{value}<extra></extra>'
+                ),
+                layout={'title': "Expense Distribution by Needs, Wants, Luxury"}
             )
-            fig.update_traces(textposition='inside', textinfo='percent+label')
             return fig
         except Exception as e:
             # Return an error figure if any exception occurs
-            return px.pie(title=f"Error generating chart: {str(e)}")
+            return create_empty_figure('pie', f"Error generating chart: {str(e)}")
     
-    @app.callback(
-        Output('nwl-trend-chart', 'figure'),
-        Input('transactions-store', 'data')
-    )
-    def update_nwl_trend_chart(transactions_data):
+    def update_nwl_trend_chart(aggs, signatures):
         """Update the NWL trend chart"""
         try:
-            df = pd.DataFrame(transactions_data)
+            if chart_data_unchanged(signatures, 'nwl-trend-chart', aggs, ['Month', 'Label', 'Amount']):
+                return no_update
+            
+            df = aggs.df
             
             # Check if the DataFrame has the required columns
             if df.empty or 'Label' not in df.columns or 'Amount' not in df.columns or 'Month' not in df.columns:
-                return px.line(title="No data available or missing required columns")
+                return create_empty_figure('line', "No data available or missing required columns")
             
-            # Skip transactions without a label
-            df = df[df['Label'].notna() & (df['Label'] != '')]
-            
-            if df.empty:
-                return px.line(title="No labeled transactions")
+            if not aggs.has_labeled:
+                return create_empty_figure('line', "No labeled transactions")
             
             # Use only Needs, Wants, Luxury labels
-            nwl_labels = ['Needs', 'Wants', 'Luxury']
-            df = df[df['Label'].isin(nwl_labels)]
-            
-            if df.empty:
-                return px.line(title="No N/W/L transactions found")
-            
-            # Ensure Amount is numeric
-            df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce')
-            df = df.dropna(subset=['Amount'])  # Drop rows where Amount couldn't be converted
+            if not aggs.has_nwl:
+                return create_empty_figure('line', "No N/W/L transactions found")
             
-            if df.empty:
-                return px.line(title="No valid data after conversion")
+            # Totals only include rows with a valid Amount
+            monthly_label_expenses = aggs.nwl_by_month_label
             
-            # Group by month and label
-            monthly_label_expenses = df.groupby(['Month', 'Label'])['Amount'].sum().reset_index()
+            if monthly_label_expenses.empty:
+                return create_empty_figure('line', "No valid data after conversion")
             
             # Create line chart with specific colors
             colors = {'Needs': '#00897B', 'Wants': '#1976D2', 'Luxury': '#E53935'}
             
-            fig = px.line(
-                monthly_label_expenses,
-                x='Month',
-                y='Amount',
-                color='Label',
-                title="Monthly Spending by Needs, Wants, Luxury",
-                markers=True,
-                color_discrete_map=colors
+            return create_grouped_figure(
+                monthly_label_expenses, 'Month', 'Amount', 'line',
+                "Monthly Spending by Needs, Wants, Luxury", color='Label', color_map=colors
             )
-            fig.update_layout(yaxis_title="Amount (₹)")
-            return fig
         except Exception as e:
             # Return an error figure if any exception occurs
-            return px.line(title=f"Error generating chart: {str(e)}")
+            return create_empty_figure('line', f"Error generating chart: {str(e)}")
     
-    @app.callback(
-        Output('nwl-category-chart', 'figure'),
-        Input('transactions-store', 'data')
-    )
-    def update_nwl_category_chart(transactions_data):
+    def update_nwl_category_chart(aggs, signatures):
         """Update the NWL category chart"""
-        df = pd.DataFrame(transactions_data)
+        if chart_data_unchanged(signatures, 'nwl-category-chart', aggs, ['Category', 'Label', 'Amount']):
+            return no_update
+        
+        df = aggs.df
         
         # Check if the DataFrame has the required columns
         if df.empty or 'Label' not in df.columns or 'Category' not in df.columns or 'Amount' not in df.columns:
-            return px.bar(title="No data available or missing required columns")
-        
-        # Skip transactions without a label
-        df = df[df['Label'].notna() & (df['Label'] != '')]
+            return create_empty_figure('bar', "No data available or missing required columns")
         
-        if df.empty:
-            return px.bar(title="No labeled transactions")
+        if not aggs.has_labeled:
+            return create_empty_figure('bar', "No labeled transactions")
         
         # Use only Needs, Wants, Luxury labels
-        nwl_labels = ['Needs', 'Wants', 'Luxury']
-        df = df[df['Label'].isin(nwl_labels)]
+        if not aggs.has_nwl:
+            return create_empty_figure('bar', "No N/W/L transactions found")
         
-        if df.empty:
-            return px.bar(title="No N/W/L transactions found")
-        
-        # Ensure Amount is numeric
-        df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce')
-        df = df.dropna(subset=['Amount'])  # Drop rows where Amount couldn't be converted
+        # Totals only include rows with a valid Amount
+        category_label_expenses = aggs.nwl_by_category_label
         
-        # Check again after potential cleanup
-        if df.empty:
-            return px.bar(title="No valid data after conversion")
+        if category_label_expenses.empty:
+            return create_empty_figure('bar', "No valid data after conversion")
         
-        # Group by category and label
         try:
-            category_label_expenses = df.groupby(['Category', 'Label'])['Amount'].sum().reset_index()
-            
-            # Get categories sorted by total amount
-            category_totals = df.groupby('Category')['Amount'].sum().sort_values(ascending=False)
-            
-            # Take top 10 categories or all if less than 10
-            num_categories = min(10, len(category_totals))
-            top_categories = category_totals.head(num_categories).index.tolist()
+            # Rank categories by their N/W/L totals rather than grouping the
+            # data a second time
+            top_categories = largest_index(aggs.nwl_category_matrix.sum(axis=1), 10)
             
             # Filter to include only top categories
             category_label_expenses = category_label_expenses[category_label_expenses['Category'].isin(top_categories)]
@@ -791,100 +817,63 @@ def register_callbacks(app):
             # Create bar chart with specific colors
             colors = {'Needs': '#00897B', 'Wants': '#1976D2', 'Luxury': '#E53935'}
             
-            fig = px.bar(
-                category_label_expenses,
-                x='Category',
-                y='Amount',
-                color='Label',
-                title="Needs, Wants, Luxury Distribution by Top Categories",
-                barmode='stack',
-                color_discrete_map=colors
+            return create_grouped_figure(
+                category_label_expenses, 'Category', 'Amount', 'bar',
+                "Needs, Wants, Luxury Distribution by Top Categories", color='Label', color_map=colors
             )
-            fig.update_layout(yaxis_title="Amount (₹)")
-            return fig
         except Exception as e:
             # Return an error figure if any exception occurs
-            return px.bar(title=f"Error generating chart: {str(e)}")
+            return create_empty_figure('bar', f"Error generating chart: {str(e)}")
     
+    # All charts built from the transactions store are updated by a single
+    # callback, so a store update is one request instead of nine
     @app.callback(
-        Output('monthly-overview-chart', 'figure'),
-        Input('transactions-store', 'data')
-    )
-    def update_monthly_overview_chart(transactions_data):
-        """Update the monthly overview chart"""
-        # We need to refresh the summary data first
-        from ..data.loader import load_data
-        current_summary_df, _, _ = load_data()
-        
-        # Use the current summary data to create the chart
-        if current_summary_df.empty:
-            return px.bar(title="No monthly data available")
-        
-        # Create bar chart
-        fig = px.bar(
-            current_summary_df, 
-            x='Month', 
-            y=['Total Income', 'Total Expenses', 'Investments'],
-            barmode='group',
-            title="Monthly Financial Overview",
-            labels={'value': 'Amount (₹)', 'variable': 'Type'},
-            color_discrete_map={
-                'Total Income': 'green', 
-                'Total Expenses': 'red',
-                'Investments': 'blue'
-            }
-        )
-        return fig
-    
-    @app.callback(
-        Output('monthly-surplus-chart', 'figure'),
-        Input('transactions-store', 'data')
+        Output('spending-by-person-chart', 'figure'),
+        Output('spending-trends-by-person-chart', 'figure'),
+        Output('daily-spending-pattern-chart', 'figure'),
+        Output('label-pie-chart', 'figure'),
+        Output('label-trend-chart', 'figure'),
+        Output('label-category-chart', 'figure'),
+        Output('nwl-pie-chart', 'figure'),
+        Output('nwl-trend-chart', 'figure'),
+        Output('nwl-category-chart', 'figure'),
+        Output('chart-signatures-store', 'data'),
+        Input('transactions-store', 'data'),
+        State('chart-signatures-store', 'data')
     )
-    def update_monthly_surplus_chart(transactions_data):
-        """Update the monthly surplus chart"""
-        # We need to refresh the summary data first
-        from ..data.loader import load_data
-        current_summary_df, _, _ = load_data()
-        
-        # Use the current summary data to create the chart
-        if current_summary_df.empty:
-            return px.line(title="No monthly data available")
-        
-        # Create line chart
-        fig = px.line(
-            current_summary_df, 
-            x='Month', 
-            y='Surplus',
-            title="Monthly Surplus Trend",
-            labels={'Surplus': 'Amount (₹)'},
-            markers=True
+    def update_store_charts(transactions_data, chart_signatures):
+        """Update all charts built from the transactions store"""
+        # Fingerprint the store once; each chart then checks whether the
+        # columns it uses changed (see chart_data_unchanged)
+        aggs = get_transaction_aggregates(transactions_data)
+        signatures = dict(chart_signatures or {})
+        return (
+            update_spending_by_person(aggs, signatures),
+            update_spending_trends_by_person(aggs, signatures),
+            update_daily_spending_pattern(aggs, signatures),
+            update_label_pie_chart(aggs, signatures),
+            update_label_trend(aggs, signatures),
+            update_label_category_chart(aggs, signatures),
+            update_nwl_pie_chart(aggs, signatures),
+            update_nwl_trend_chart(aggs, signatures),
+            update_nwl_category_chart(aggs, signatures),
+            signatures
         )
-        return fig
     
-    @app.callback(
-        Output('monthly-investments-chart', 'figure'),
-        Input('transactions-store', 'data')
-    )
-    def update_monthly_investments_chart(transactions_data):
-        """Update the monthly investments chart"""
-        # We need to refresh the summary data first
-        from ..data.loader import load_data
-        current_summary_df, _, _ = load_data()
-        
-        # Use the current summary data to create the chart
-        if current_summary_df.empty:
-            return px.line(title="No monthly data available")
-        
-        # Create line chart
-        fig = px.line(
-            current_summary_df, 
-            x='Month', 
-            y='Investments',
-            title="Monthly Investments Trend",
-            labels={'Investments': 'Amount (₹)'},
-            markers=True
+    # The monthly charts only depend on the summary data, so they are built
+    # in the browser (see assets/charts.js). The current figure is passed in
+    # so the new one can keep its template.
+    for chart_id, chart_function in (
+        ('monthly-overview-chart', 'monthlyOverview'),
+        ('monthly-surplus-chart', 'monthlySurplus'),
+        ('monthly-investments-chart', 'monthlyInvestments')
+    ):
+        app.clientside_callback(
+            ClientsideFunction(namespace='charts', function_name=chart_function),
+            Output(chart_id, 'figure'),
+            Input('summary-store', 'data'),
+            State(chart_id, 'figure')
         )
-        return fig
     
     # Callbacks for refresh and file management
     @app.callback(
@@ -902,45 +891,66 @@ def register_callbacks(app):
                           style={'fontStyle': 'italic'})
         
         # Create list of available files (without individual delete buttons to avoid callback issues)
-        file_list = []
-        for file in excel_files:
-            file_list.append(html.Div([
-                html.Span(file, style={'marginRight': '10px'})
-            ], style={'margin': '5px 0'}))
+        file_list = html.Ul([html.Li(file) for file in excel_files], style={'margin': 0, 'paddingLeft': '1em'})
         
         # Add a note about deletion
-        file_list.append(html.Div([
+        deletion_note = html.Div([
             html.Hr(),
             html.P("To delete files, use your file explorer to remove them from the data directory, then click 'Refresh Dashboard'.", 
                   style={'fontStyle': 'italic', 'fontSize': '0.9em'})
-        ]))
+        ])
         
-        return html.Div(file_list)
+        return html.Div([file_list, deletion_note])
+    
+    # Refresh and upload return the dashboard visibility and card values as
+    # one dashboard-state dict; spread it over the components in the browser.
+    # Cards are left as they are when the state has no values for them.
+    app.clientside_callback(
+        """
+        function(state) {
+            var noUpdate = window.dash_clientside.no_update;
+            if (!state) {
+                return Array(12).fill(noUpdate);
+            }
+            var cards = state.cards || Array(10).fill(noUpdate);
+            return [state.dashboard_style, state.no_files_style].concat(cards);
+        }
+        """,
+        Output('dashboard-content', 'style'),
+        Output('no-files-message', 'style'),
+        Output('ytd-income-display', 'children'),
+        Output('ytd-expenses-display', 'children'),
+        Output('ytd-investments-display', 'children'),
+        Output('ytd-surplus-display', 'children'),
+        Output('avg-monthly-income-value', 'children'),
+        Output('avg-monthly-expenses-value', 'children'),
+        Output('avg-monthly-investments-value', 'children'),
+        Output('avg-monthly-surplus-value', 'children'),
+        Output('monthly-needs-value', 'children'),
+        Output('emergency-fund-value', 'children'),
+        Input('dashboard-state', 'data'),
+        prevent_initial_call=True
+    )
     
     # Callback to refresh the dashboard and toggle visibility
     @app.callback(
         [Output('refresh-output', 'children', allow_duplicate=True),
-         Output('dashboard-content', 'style', allow_duplicate=True),
-         Output('no-files-message', 'style', allow_duplicate=True),
+         # Dashboard visibility and card values (built by dashboard_state and
+         # spread over the components by the dashboard-state clientside callback)
+         Output('dashboard-state', 'data', allow_duplicate=True),
          Output('transactions-store', 'data', allow_duplicate=True),
-         # Add outputs for the YTD cards
-         Output('ytd-income-display', 'children', allow_duplicate=True),
-         Output('ytd-expenses-display', 'children', allow_duplicate=True),
-         Output('ytd-investments-display', 'children', allow_duplicate=True),
-         Output('ytd-surplus-display', 'children', allow_duplicate=True),
-         # Add outputs for monthly averages
-         Output('avg-monthly-income-value', 'children', allow_duplicate=True),
-         Output('avg-monthly-expenses-value', 'children', allow_duplicate=True),
-         Output('avg-monthly-investments-value', 'children', allow_duplicate=True),
-         Output('avg-monthly-surplus-value', 'children', allow_duplicate=True),
-         # Add outputs for financial planning cards
-         Output('monthly-needs-value', 'children', allow_duplicate=True),
-         Output('emergency-fund-value', 'children', allow_duplicate=True),
+         Output('summary-store', 'data', allow_duplicate=True),
          # Add output for the toast
          Output('refresh-toast', 'is_open', allow_duplicate=True),
          Output('refresh-toast', 'header', allow_duplicate=True),
          Output('refresh-toast', 'children', allow_duplicate=True)],
         Input('refresh-button', 'n_clicks'),
+        # Reloading rereads every Excel file; keep the button disabled
+        # meanwhile so repeated clicks don't queue up more reloads
+        running=[
+            (Output('refresh-button', 'disabled'), True, False),
+            (Output('refresh-button', 'children'), 'Refreshing...', 'Refresh Dashboard')
+        ],
         prevent_initial_call=True
     )
     def refresh_dashboard(n_clicks):
@@ -950,96 +960,23 @@ def register_callbacks(app):
             try:
                 print("Performing complete dashboard refresh...")
                 
-                # Reset all global data
-                global summary_df, all_transactions_df, category_monthly_df
-                
                 # Force reload of all data
-                summary_df, all_transactions_df, category_monthly_df = load_data()
-                
-                # Calculate YTD values freshly
-                ytd_income = summary_df['Total Income'].sum() if not summary_df.empty else 0
-                ytd_expenses = summary_df['Total Expenses'].sum() if not summary_df.empty else 0
-                ytd_investments = summary_df['Investments'].sum() if not summary_df.empty else 0
-                ytd_surplus = summary_df['Surplus'].sum() if not summary_df.empty else 0
-                
-                print(f"YTD Income after refresh: {ytd_income}")
-                print(f"YTD Expenses after refresh: {ytd_expenses}")
-                print(f"YTD Investments after refresh: {ytd_investments}")
-                print(f"YTD Surplus after refresh: {ytd_surplus}")
-                
-                # Check if files exist after refresh
-                has_files_now = has_excel_files()
-                
-                # Set visibility of dashboard and no-files message
-                dashboard_style = {'display': 'block'} if has_files_now else {'display': 'none'}
-                no_files_style = {'display': 'none'} if has_files_now else {'display': 'block', 'marginTop': '20px'}
-                
-                # Get transaction data for updating all charts
-                transactions_data = all_transactions_df.to_dict('records') if not all_transactions_df.empty else []
+                summary = reload_and_summarize()
+                (income_display, expenses_display, investments_display, surplus_display,
+                 avg_income_display, avg_expenses_display, avg_investments_display, avg_surplus_display,
+                 monthly_needs_display, emergency_fund_display) = summary.displays
+                month_count = summary.month_count
                 
                 timestamp = datetime.now().strftime('%H:%M:%S')
                 
                 print(f"Dashboard refresh completed at {timestamp}")
                 
-                # Calculate monthly averages
-                month_count = len(month_names)
-                avg_monthly_income = ytd_income / max(1, month_count)
-                avg_monthly_expenses = ytd_expenses / max(1, month_count)
-                avg_monthly_investments = ytd_investments / max(1, month_count)
-                avg_monthly_surplus = ytd_surplus / max(1, month_count)
-                
-                # Calculate updated monthly needs and emergency fund
-                avg_monthly_needs = avg_monthly_expenses * 0.5  # Default: 50% of expenses
-                
-                # If we have labeled data, calculate based on actual "Needs" transactions
-                if not all_transactions_df.empty and 'Label' in all_transactions_df.columns:
-                    # Get transactions labeled as 'Needs'
-                    needs_transactions = all_transactions_df[all_transactions_df['Label'] == 'Needs']
-                    
-                    if not needs_transactions.empty:
-                        # Ensure Amount is numeric
-                        needs_transactions['Amount'] = pd.to_numeric(needs_transactions['Amount'], errors='coerce')
-                        needs_transactions = needs_transactions.dropna(subset=['Amount'])
-                        
-                        if not needs_transactions.empty:
-                            # Calculate monthly needs by first grouping by month
-                            monthly_needs = needs_transactions.groupby('Month')['Amount'].sum()
-                            
-                            # Calculate the average of monthly needs (average across months)
-                            if len(monthly_needs) > 0:
-                                avg_monthly_needs = monthly_needs.mean()
-                
-                # Calculate emergency fund suggestion (6 times monthly needs)
-                emergency_fund_suggestion = avg_monthly_needs * 6
-                
-                # Print the values to ensure they're calculated correctly
-                print(f"avg_monthly_needs for refresh: {avg_monthly_needs}")
-                print(f"emergency_fund_suggestion for refresh: {emergency_fund_suggestion}")
-                
-                # Format the values for display
-                income_display = format_inr(ytd_income)
-                expenses_display = format_inr(ytd_expenses)
-                investments_display = format_inr(ytd_investments)
-                surplus_display = format_inr(ytd_surplus)
-                
-                avg_income_display = format_inr(avg_monthly_income)
-                avg_expenses_display = format_inr(avg_monthly_expenses)
-                avg_investments_display = format_inr(avg_monthly_investments)
-                avg_surplus_display = format_inr(avg_monthly_surplus)
-                
-                monthly_needs_display = format_inr(avg_monthly_needs)
-                emergency_fund_display = format_inr(emergency_fund_suggestion)
-                
-                # Get information about files loaded
-                excel_files, _ = get_excel_files()
-                file_count = len(excel_files)
-                
                 # Create toast contents with summary data
                 toast_header = f"Dashboard Refreshed ({timestamp})"
                 toast_content = html.Div([
                     html.H5("Refresh Summary", className="mb-2"),
                     html.P([
-                        f"Files loaded: ", html.B(f"{file_count}"), 
+                        f"Files loaded: ", html.B(f"{summary.file_count}"), 
                         " files covering ", html.B(f"{month_count}"), " months"
                     ]),
                     html.Hr(className="my-2"),
@@ -1069,19 +1006,9 @@ def register_callbacks(app):
                         html.Span(f"Total Income (YTD): {income_display} | Total Expenses (YTD): {expenses_display}", 
                                  style={'fontSize': '0.9em', 'color': '#555'})
                     ]),
-                    dashboard_style,
-                    no_files_style,
-                    transactions_data,  # Return updated transaction data to refresh all tabs
-                    income_display,     # Update YTD cards
-                    expenses_display,
-                    investments_display,
-                    surplus_display,
-                    avg_income_display,  # Update monthly average cards
-                    avg_expenses_display,
-                    avg_investments_display,
-                    avg_surplus_display,
-                    monthly_needs_display,  # Update financial planning cards
-                    emergency_fund_display,
+                    dashboard_state(summary.has_files, summary.displays),  # Show the dashboard and update the cards
+                    summary.transactions_data,  # Return updated transaction data to refresh all tabs
+                    summary.summary_data,       # Return updated summary data for the monthly charts
                     True,              # Show the toast
                     toast_header,      # Toast header
                     toast_content      # Toast content
@@ -1097,45 +1024,24 @@ def register_callbacks(app):
                 
                 return (
                     html.Div("Error refreshing data: {}".format(str(e)), style={'color': 'red'}),
-                    {'display': 'none'},
-                    {'display': 'block', 'marginTop': '20px'},
-                    [],  # Empty data for transactions store
-                    dash.no_update,  # Don't update YTD cards on error
-                    dash.no_update,
-                    dash.no_update,
-                    dash.no_update,
-                    dash.no_update,  # Don't update monthly average cards on error
-                    dash.no_update,
-                    dash.no_update,
-                    dash.no_update,
-                    dash.no_update,  # Don't update financial planning cards on error
-                    dash.no_update,
+                    dashboard_state(False),  # Hide the dashboard, don't update the cards on error
+                    transactions_to_store(pd.DataFrame()),  # Empty data for transactions store
+                    [],  # Empty data for summary store
                     True,  # Show toast even on error
                     "Refresh Error",  # Toast header for error
                     error_toast_content  # Toast content for error
                 )
         # Default case (no click event)
-        return "", {'display': 'none'}, {'display': 'block', 'marginTop': '20px'}, [], dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, False, dash.no_update, dash.no_update
+        return "", dashboard_state(False), transactions_to_store(pd.DataFrame()), [], False, dash.no_update, dash.no_update
     
     # Callback for file upload
     @app.callback(
         [Output('upload-output', 'children'),
-         Output('dashboard-content', 'style'),
-         Output('no-files-message', 'style'),
+         # Dashboard visibility and card values (built by dashboard_state and
+         # spread over the components by the dashboard-state clientside callback)
+         Output('dashboard-state', 'data', allow_duplicate=True),
          Output('transactions-store', 'data', allow_duplicate=True),
-         # Add outputs for the YTD cards
-         Output('ytd-income-display', 'children', allow_duplicate=True),
-         Output('ytd-expenses-display', 'children', allow_duplicate=True),
-         Output('ytd-investments-display', 'children', allow_duplicate=True),
-         Output('ytd-surplus-display', 'children', allow_duplicate=True),
-         # Add outputs for monthly averages
-         Output('avg-monthly-income-value', 'children', allow_duplicate=True),
-         Output('avg-monthly-expenses-value', 'children', allow_duplicate=True),
-         Output('avg-monthly-investments-value', 'children', allow_duplicate=True),
-         Output('avg-monthly-surplus-value', 'children', allow_duplicate=True),
-         # Add outputs for financial planning cards
-         Output('monthly-needs-value', 'children', allow_duplicate=True),
-         Output('emergency-fund-value', 'children', allow_duplicate=True),
+         Output('summary-store', 'data', allow_duplicate=True),
          # Add output for the toast
          Output('refresh-toast', 'is_open', allow_duplicate=True),
          Output('refresh-toast', 'header', allow_duplicate=True),
@@ -1149,10 +1055,7 @@ def register_callbacks(app):
         """Process uploaded files and update the dashboard"""
         if list_of_contents is None:
             # Get current state of files
-            has_files_now = has_excel_files()
-            dashboard_style = {'display': 'block'} if has_files_now else {'display': 'none'}
-            no_files_style = {'display': 'none'} if has_files_now else {'display': 'block', 'marginTop': '20px'}
-            return html.Div("Upload your Excel files to get started."), dashboard_style, no_files_style, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, False, dash.no_update, dash.no_update
+            return html.Div("Upload your Excel files to get started."), dashboard_state(has_excel_files()), dash.no_update, dash.no_update, False, dash.no_update, dash.no_update
         
         upload_results = []
         data_dir = get_data_dir()
@@ -1177,50 +1080,10 @@ def register_callbacks(app):
             try:
                 print("Upload was successful, performing complete data reload...")
                 
-                # Reset global data
-                global summary_df, all_transactions_df, category_monthly_df
-                
                 # Force reload of all data
-                summary_df, all_transactions_df, category_monthly_df = load_data()
-                
-                # Calculate YTD values freshly
-                ytd_income = summary_df['Total Income'].sum() if not summary_df.empty else 0
-                ytd_expenses = summary_df['Total Expenses'].sum() if not summary_df.empty else 0
-                ytd_investments = summary_df['Investments'].sum() if not summary_df.empty else 0
-                ytd_surplus = summary_df['Surplus'].sum() if not summary_df.empty else 0
-                
-                print(f"Data reload complete. YTD Income: {ytd_income}, YTD Expenses: {ytd_expenses}, YTD Investments: {ytd_investments}, YTD Surplus: {ytd_surplus}")
-                
-                # Calculate monthly averages
-                month_count = len(month_names)
-                avg_monthly_income = ytd_income / max(1, month_count)
-                avg_monthly_expenses = ytd_expenses / max(1, month_count)
-                avg_monthly_investments = ytd_investments / max(1, month_count)
-                avg_monthly_surplus = ytd_surplus / max(1, month_count)
-                
-                # Calculate updated monthly needs and emergency fund
-                avg_monthly_needs = avg_monthly_expenses * 0.5  # Default: 50% of expenses
-                
-                # If we have labeled data, calculate based on actual "Needs" transactions
-                if not all_transactions_df.empty and 'Label' in all_transactions_df.columns:
-                    # Get transactions labeled as 'Needs'
-                    needs_transactions = all_transactions_df[all_transactions_df['Label'] == 'Needs']
-                    
-                    if not needs_transactions.empty:
-                        # Ensure Amount is numeric
-                        needs_transactions['Amount'] = pd.to_numeric(needs_transactions['Amount'], errors='coerce')
-                        needs_transactions = needs_transactions.dropna(subset=['Amount'])
-                        
-                        if not needs_transactions.empty:
-                            # Calculate monthly needs by first grouping by month
-                            monthly_needs = needs_transactions.groupby('Month')['Amount'].sum()
-                            
-                            # Calculate the average of monthly needs (average across months)
-                            if len(monthly_needs) > 0:
-                                avg_monthly_needs = monthly_needs.mean()
-                
-                # Calculate emergency fund suggestion (6 times monthly needs)
-                emergency_fund_suggestion = avg_monthly_needs * 6
+                summary = reload_and_summarize()
+                income_display, expenses_display, investments_display, surplus_display = summary.displays[:4]
+                monthly_needs_display, emergency_fund_display = summary.displays[8:]
                 
                 # Add automatic refresh message
                 upload_results.append(html.Div([
@@ -1229,33 +1092,13 @@ def register_callbacks(app):
                         style={'fontWeight': 'bold', 'marginTop': '10px', 'color': 'green'}
                     ),
                     html.Div(
-                        f"Total Income (YTD): ₹{ytd_income:,.2f} | Total Expenses (YTD): ₹{ytd_expenses:,.2f}",
+                        f"Total Income (YTD): {income_display} | Total Expenses (YTD): {expenses_display}",
                         style={'fontSize': '0.9em', 'color': '#555', 'marginTop': '5px'}
                     )
                 ]))
                 
-                # Prepare transaction data for updating all charts
-                transactions_data = all_transactions_df.to_dict('records') if not all_transactions_df.empty else []
-                
-                # Format the values for display
-                income_display = format_inr(ytd_income)
-                expenses_display = format_inr(ytd_expenses)
-                investments_display = format_inr(ytd_investments)
-                surplus_display = format_inr(ytd_surplus)
-                
-                avg_income_display = format_inr(avg_monthly_income)
-                avg_expenses_display = format_inr(avg_monthly_expenses)
-                avg_investments_display = format_inr(avg_monthly_investments)
-                avg_surplus_display = format_inr(avg_monthly_surplus)
-                
-                monthly_needs_display = format_inr(avg_monthly_needs)
-                emergency_fund_display = format_inr(emergency_fund_suggestion)
-                
                 # Create toast content with uploaded files summary
                 timestamp = datetime.now().strftime('%H:%M:%S')
-                excel_files, _ = get_excel_files()
-                file_count = len(excel_files)
-                
                 uploaded_files = [f for f in list_of_filenames if f.endswith('.xlsx')]
                 
                 toast_header = f"Files Uploaded Successfully ({timestamp})"
@@ -1266,7 +1109,7 @@ def register_callbacks(app):
                     ]),
                     html.Ul([html.Li(filename) for filename in uploaded_files]),
                     html.Hr(className="my-2"),
-                    html.P(f"Total files now available: {file_count} files covering {month_count} months"),
+                    html.P(f"Total files now available: {summary.file_count} files covering {summary.month_count} months"),
                     html.P("Year to Date Totals:", className="font-weight-bold mt-3 mb-1"),
                     html.Ul([
                         html.Li([html.Span("Income: "), html.Span(income_display, className="text-success")]),
@@ -1281,15 +1124,8 @@ def register_callbacks(app):
                     ])
                 ])
                 
-                # Check if we have files after upload
-                has_files_now = has_excel_files()
-                dashboard_style = {'display': 'block'} if has_files_now else {'display': 'none'}
-                no_files_style = {'display': 'none'} if has_files_now else {'display': 'block', 'marginTop': '20px'}
-                
-                # All values prepared for update
-                
                 # Return all values including YTD card updates and toast
-                return html.Div(upload_results), dashboard_style, no_files_style, transactions_data, income_display, expenses_display, investments_display, surplus_display, avg_income_display, avg_expenses_display, avg_investments_display, avg_surplus_display, monthly_needs_display, emergency_fund_display, True, toast_header, toast_content
+                return html.Div(upload_results), dashboard_state(summary.has_files, summary.displays), summary.transactions_data, summary.summary_data, True, toast_header, toast_content
             except Exception as e:
                 error_msg = str(e)
                 print(f"Error during data reload after upload: {error_msg}")
@@ -1311,13 +1147,8 @@ def register_callbacks(app):
                     html.P(error_msg, className="p-2 bg-light border rounded text-danger")
                 ])
                 
-                # Check if we have files after upload
-                has_files_now = has_excel_files()
-                dashboard_style = {'display': 'block'} if has_files_now else {'display': 'none'}
-                no_files_style = {'display': 'none'} if has_files_now else {'display': 'block', 'marginTop': '20px'}
-                
-                # Keep YTD displays the same if there's an error
-                return html.Div(upload_results), dashboard_style, no_files_style, transactions_data, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, True, "Upload Error", error_toast_content
+                # Check if we have files after upload; keep YTD displays the same if there's an error
+                return html.Div(upload_results), dashboard_state(has_excel_files()), transactions_data, dash.no_update, True, "Upload Error", error_toast_content
         else:
             # Add message to use refresh button if no successful uploads
             upload_results.append(html.Div(
@@ -1326,10 +1157,5 @@ def register_callbacks(app):
             ))
             transactions_data = dash.no_update
             
-            # Check if we have files after upload
-            has_files_now = has_excel_files()
-            dashboard_style = {'display': 'block'} if has_files_now else {'display': 'none'}
-            no_files_style = {'display': 'none'} if has_files_now else {'display': 'block', 'marginTop': '20px'}
-            
-            # Keep YTD displays the same if there's no successful upload
-            return html.Div(upload_results), dashboard_style, no_files_style, transactions_data, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, True, "Upload Warning", html.P("No files were successfully uploaded. Please check the file format and try again.")
\ No newline at end of file
+            # Check if we have files after upload; keep YTD displays the same if there's no successful upload
+            return html.Div(upload_results), dashboard_state(has_excel_files()), transactions_data, dash.no_update, True, "Upload Warning", html.P("No files were successfully uploaded. Please check the file format and try again.")
\ No newline at end of file
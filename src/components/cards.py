@@ -30,6 +30,41 @@ def create_summary_card(title, value, color_class, card_id=None):
         dbc.CardBody([h3_component])
     ], className="mb-4")
 
+# (title, value color class, value element ID) of each card in the YTD and
+# monthly average rows; callbacks update the values through these IDs
+YTD_CARDS = (
+    ("Total Income (YTD)", "text-success", "ytd-income-display"),
+    ("Total Expenses (YTD)", "text-danger", "ytd-expenses-display"),
+    ("Total Investments (YTD)", "text-info", "ytd-investments-display"),
+    ("Total Surplus (YTD)", "text-primary", "ytd-surplus-display")
+)
+
+MONTHLY_AVERAGE_CARDS = (
+    ("Avg. Monthly Income", "text-dark", "avg-monthly-income-value"),
+    ("Avg. Monthly Expenses", "text-dark", "avg-monthly-expenses-value"),
+    ("Avg. Monthly Investments", "text-dark", "avg-monthly-investments-value"),
+    ("Avg. Monthly Surplus", "text-dark", "avg-monthly-surplus-value")
+)
+
+def create_summary_card_row(cards, values):
+    """
+    Create a row of equal-width summary cards
+    
+    Args:
+        cards: Tuple of (title, color_class, card_id) for each card
+        values: Numeric value shown on each card
+    
+    Returns:
+        A dbc.Row component containing cards
+    """
+    width = 12 // len(cards)
+    return dbc.Row([
+        dbc.Col([
+            create_summary_card(title, format_inr(value), color_class, card_id)
+        ], width=width)
+        for (title, color_class, card_id), value in zip(cards, values)
+    ])
+
 def create_ytd_summary_cards(ytd_income, ytd_expenses, ytd_investments, ytd_surplus):
     """
     Create a row of summary cards for YTD financial information
@@ -43,43 +78,7 @@ def create_ytd_summary_cards(ytd_income, ytd_expenses, ytd_investments, ytd_surp
     Returns:
         A dbc.Row component containing cards
     """
-    return dbc.Row([
-        dbc.Col([
-            create_summary_card(
-                "Total Income (YTD)",
-                format_inr(ytd_income),
-                "text-success",
-                "ytd-income-display"
-            )
-        ], width=3),
-        
-        dbc.Col([
-            create_summary_card(
-                "Total Expenses (YTD)",
-                format_inr(ytd_expenses),
-                "text-danger",
-                "ytd-expenses-display"
-            )
-        ], width=3),
-        
-        dbc.Col([
-            create_summary_card(
-                "Total Investments (YTD)",
-                format_inr(ytd_investments),
-                "text-info",
-                "ytd-investments-display"
-            )
-        ], width=3),
-        
-        dbc.Col([
-            create_summary_card(
-                "Total Surplus (YTD)",
-                format_inr(ytd_surplus),
-                "text-primary",
-                "ytd-surplus-display"
-            )
-        ], width=3)
-    ])
+    return create_summary_card_row(YTD_CARDS, (ytd_income, ytd_expenses, ytd_investments, ytd_surplus))
 
 def create_monthly_averages_cards(avg_monthly_income, avg_monthly_expenses, 
                                  avg_monthly_investments, avg_monthly_surplus):
@@ -95,43 +94,10 @@ def create_monthly_averages_cards(avg_monthly_income, avg_monthly_expenses,
     Returns:
         A dbc.Row component containing cards
     """
-    return dbc.Row([
-        dbc.Col([
-            create_summary_card(
-                "Avg. Monthly Income",
-                format_inr(avg_monthly_income),
-                "text-dark",
-                "avg-monthly-income-value"
-            )
-        ], width=3),
-        
-        dbc.Col([
-            create_summary_card(
-                "Avg. Monthly Expenses",
-                format_inr(avg_monthly_expenses),
-                "text-dark",
-                "avg-monthly-expenses-value"
-            )
-        ], width=3),
-        
-        dbc.Col([
-            create_summary_card(
-                "Avg. Monthly Investments",
-                format_inr(avg_monthly_investments),
-                "text-dark",
-                "avg-monthly-investments-value"
-            )
-        ], width=3),
-        
-        dbc.Col([
-            create_summary_card(
-                "Avg. Monthly Surplus",
-                format_inr(avg_monthly_surplus),
-                "text-dark",
-                "avg-monthly-surplus-value"
-            )
-        ], width=3)
-    ])
+    return create_summary_card_row(
+        MONTHLY_AVERAGE_CARDS,
+        (avg_monthly_income, avg_monthly_expenses, avg_monthly_investments, avg_monthly_surplus)
+    )
 
 def create_financial_planning_cards(avg_monthly_needs, emergency_fund_suggestion):
     """
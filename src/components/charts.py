@@ -0,0 +1,127 @@
+"""
+Chart components for the budget dashboard
+"""
+from functools import lru_cache
+
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+from dash import Patch
+
+# Colors given to groups without an explicit color, same as plotly.express
+DEFAULT_COLORS = qualitative.Plotly
+
+def create_base_figure(**layout):
+    """
+    Create an empty figure to initialize a graph that is updated with Patch
+    
+    Callbacks for these graphs only send the new traces and title, so any
+    layout that should stay fixed (axis titles etc.) is set here.
+    
+    Args:
+        **layout: Layout properties for the figure
+    
+    Returns:
+        A go.Figure with no traces
+    """
+    return go.Figure(layout=layout)
+
+def create_chart_patch(traces, title):
+    """
+    Create a Patch that replaces a figure's traces and title
+    
+    Args:
+        traces: List of traces (go trace objects or dicts)
+        title: The figure title
+    
+    Returns:
+        A dash.Patch leaving the rest of the figure layout untouched
+    """
+    patch = Patch()
+    patch['data'] = [trace.to_plotly_json() if hasattr(trace, 'to_plotly_json') else trace for trace in traces]
+    patch['layout']['title']['text'] = title
+    return patch
+
+@lru_cache(maxsize=None)
+def _empty_figure_base(kind):
+    """Build the empty plotly.express figure of the given kind once"""
+    return getattr(px, kind)().to_plotly_json()
+
+def create_empty_figure(kind, title):
+    """
+    Create an empty chart with only a title, e.g. for "No data" states
+    
+    This returns the same figure as calling px.pie(title=title) etc., but
+    the plotly.express figure is only built once per kind and reused.
+    
+    Args:
+        kind: The plotly.express function name ('pie', 'bar', 'line' or 'scatter')
+        title: The figure title
+    
+    Returns:
+        A figure dict
+    """
+    base = _empty_figure_base(kind)
+    return {'data': base['data'], 'layout': {**base['layout'], 'title': {'text': title}}}
+
+def create_grouped_figure(df, x, y, kind, title, color=None, color_map=None, yaxis_title="Amount (₹)"):
+    """
+    Create a line or stacked bar chart with one trace per group
+    
+    Builds the go traces directly, which looks the same as px.line(...,
+    markers=True) or px.bar(..., barmode='stack') but skips the
+    plotly.express data processing.
+    
+    Args:
+        df: DataFrame with the data to plot
+        x: Column for the x axis
+        y: Column for the y axis
+        kind: 'line' or 'bar'
+        title: The figure title
+        color: Optional column to split the data into traces by
+        color_map: Optional dict of group value to color
+        yaxis_title: Title of the y axis
+    
+    Returns:
+        A go.Figure
+    """
+    color_map = color_map or {}
+    groups = df.groupby(color, observed=True, sort=False) if color else [(None, df)]
+    
+    traces = []
+    next_color = 0
+    for name, group in groups:
+        if color:
+            name = name[0] if isinstance(name, tuple) else name
+            trace_color = color_map.get(name)
+            hovertemplate = f"{color}={name}<br>{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>"
+        else:
+            trace_color = None
+            hovertemplate = f"{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>"
+        if trace_color is None:
+            trace_color = DEFAULT_COLORS[next_color % len(DEFAULT_COLORS)]
+            next_color += 1
+        
+        trace_args = dict(
+            x=group[x].to_numpy(),
+            y=group[y].to_numpy(),
+            name='' if name is None else str(name),
+            legendgroup='' if name is None else str(name),
+            showlegend=color is not None,
+            hovertemplate=hovertemplate
+        )
+        if kind == 'bar':
+            traces.append(go.Bar(marker={'color': trace_color}, **trace_args))
+        else:
+            traces.append(go.Scatter(mode='lines+markers', line={'color': trace_color}, **trace_args))
+    
+    layout = dict(
+        title={'text': title},
+        xaxis={'title': {'text': x}},
+        yaxis={'title': {'text': yaxis_title}},
+        legend={'title': {'text': color}, 'tracegroupgap': 0} if color else {'tracegroupgap': 0}
+    )
+    if kind == 'bar':
+        layout['barmode'] = 'stack'
+    
+    return go.Figure(data=traces, layout=layout)
@@ -2,51 +2,464 @@
 Data loading and processing functions for budget dashboard
 """
 import os
+from collections import namedtuple
+from functools import lru_cache
 import pandas as pd
 import numpy as np
+from pandas.api.types import union_categoricals
 from datetime import datetime
 import base64
 import io
+import logging
+import multiprocessing
 import shutil
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-from ..utils.helpers import get_data_dir, get_template_path
+from ..utils.helpers import get_data_dir, get_template_path, configure_logging
 
-# Global variables to store month information
-months = []
-month_names = []
-dashboard_errors = []
+logger = logging.getLogger(__name__)
+
+# Result of load_data. months are the file names without extension and
+# month_names their display names, both in month order; errors lists the
+# problems found while reading the files
+LoadResult = namedtuple('LoadResult', [
+    'summary_df', 'transactions_df', 'category_df', 'months', 'month_names', 'errors'
+])
+
+# Columns of the monthly summary returned by load_data
+SUMMARY_COLUMNS = [
+    'Month', 'Total Income', 'Total Expenses', 'Investments', 'Surplus',
+    'Top Expense Category', 'Top Expense Amount'
+]
+
+# Text columns of the loaded transactions that are stored as categoricals.
+# Amount stays float64, float32 would round larger rupee amounts
+CATEGORICAL_COLUMNS = ('Category', 'Label', 'Who', 'Whom', 'Month')
+
+# _process_month results of the files read by the last load_data call,
+# keyed by (file path, month name, month number, size, modification time)
+# so that unchanged files are not parsed again
+_month_cache = {}
+
+# Parse files in worker processes only when at least this many need
+# parsing; below that, starting the pool costs more than it saves
+PARALLEL_MIN_FILES = 6
+
+# Base64 characters of an upload decoded and written at a time; a multiple
+# of 4 so that each chunk decodes on its own (768 KiB of file data)
+UPLOAD_CHUNK_CHARS = 4 * 256 * 1024
+
+# Full month names for the month names and abbreviations used as file names
+_MONTH_NAME_MAP = {
+    "Jan": "January", "January": "January",
+    "Feb": "February", "February": "February",
+    "Mar": "March", "March": "March",
+    "Apr": "April", "April": "April",
+    "May": "May",
+    "Jun": "June", "June": "June",
+    "Jul": "July", "July": "July",
+    "Aug": "August", "August": "August",
+    "Sep": "September", "Sept": "September", "September": "September",
+    "Oct": "October", "October": "October",
+    "Nov": "November", "November": "November",
+    "Dec": "December", "December": "December"
+}
+
+# Position of each month in the year, used to sort the monthly files
+_MONTH_ORDER = {
+    "January": 1, "February": 2, "March": 3, "April": 4,
+    "May": 5, "June": 6, "July": 7, "August": 8,
+    "September": 9, "October": 10, "November": 11, "December": 12
+}
+
+# Full labels for the short label codes used in the Excel files
+_LABEL_NAMES = {
+    'N': 'Needs',
+    'W': 'Wants',
+    'L': 'Luxury',
+    'S': 'Savings',
+    'I': 'Investment'
+}
+
+# Label cell values accepted in the Excel files (after upper-casing); the
+# last three are how blank cells read
+_VALID_LABEL_CODES = frozenset(_LABEL_NAMES) | {'NAN', 'NONE', ''}
+
+# Day 0 of Excel date serial numbers in the 1900 (datemode 0) and 1904
+# (datemode 1) date systems
+_EXCEL_EPOCHS = {0: pd.Timestamp('1899-12-30'), 1: pd.Timestamp('1904-01-01')}
+
+# Files in the data directory that are templates, not monthly data
+TEMPLATE_FILES = ('Template.xlsx', 'BlankTemplate.xlsx')
+
+@lru_cache(maxsize=4)
+def _scan_xlsx_files(data_dir, mtime_ns):
+    """Scan a directory for .xlsx files; mtime_ns only keys the cache"""
+    with os.scandir(data_dir) as entries:
+        return tuple(entry.name for entry in entries if entry.is_file() and entry.name.endswith('.xlsx'))
+
+def _list_xlsx_files(data_dir):
+    """
+    List the .xlsx files in a directory
+    
+    The scan is cached on the directory's modification time, which changes
+    whenever a file is added, removed or renamed, so repeated calls only
+    cost one stat.
+    """
+    return list(_scan_xlsx_files(data_dir, os.stat(data_dir).st_mtime_ns))
 
 def get_excel_files():
-    """Get list of Excel files in the data directory"""
-    data_dir = get_data_dir()
+    """
+    Get list of Excel files in the data directory
     
-    # List of template files to exclude from data loading
-    template_files = ['Template.xlsx', 'BlankTemplate.xlsx']
+    Returns excel_files, data_dir
+    """
+    data_dir = get_data_dir()
     
     # Get all Excel files but exclude templates
-    excel_files = [f for f in os.listdir(data_dir) if f.endswith('.xlsx') and f not in template_files]
+    excel_files = [f for f in _list_xlsx_files(data_dir) if f not in TEMPLATE_FILES]
     
     return excel_files, data_dir
 
+def clear_excel_files_cache():
+    """Force the next get_excel_files call to scan the data directory again"""
+    _scan_xlsx_files.cache_clear()
+
 def has_excel_files():
     """Check if there are any Excel files in the data directory"""
     excel_files, _ = get_excel_files()
     return len(excel_files) > 0
 
+def _excel_date_column(values, cell_types, datemode):
+    """
+    Convert the date cells of a column read with xlrd to datetimes
+    
+    A column of date (and empty) cells is converted from the serial numbers
+    in one vectorized step, rounded to the nearest second like
+    xlrd.xldate_as_tuple. Columns that also hold other values, or serials
+    xlrd treats specially (times without a date and the ambiguous days
+    before March 1900), are converted cell by cell.
+    
+    Args:
+        values: Cell values from Sheet.col_values
+        cell_types: Cell types from Sheet.col_types
+        datemode: The workbook's datemode (0 for the 1900 date system, 1 for 1904)
+    
+    Returns:
+        A DatetimeIndex, or a list with datetimes for the date cells
+    """
+    import xlrd
+    
+    cell_types = np.asarray(cell_types)
+    is_date = cell_types == xlrd.XL_CELL_DATE
+    is_empty = (cell_types == xlrd.XL_CELL_EMPTY) | (cell_types == xlrd.XL_CELL_BLANK)
+    
+    serials = np.full(len(values), np.nan)
+    serials[is_date] = np.asarray(values, dtype=object)[is_date].astype(float)
+    
+    if (is_date | is_empty).all() and (serials[is_date] >= 61).all():
+        days = np.floor(serials)
+        seconds = np.round((serials - days) * 86400.0)
+        return _EXCEL_EPOCHS[datemode] + pd.to_timedelta(days * 86400 + seconds, unit='s')
+    
+    return [
+        datetime(*xlrd.xldate_as_tuple(value, datemode)) if cell_type == xlrd.XL_CELL_DATE else value
+        for value, cell_type in zip(values, cell_types)
+    ]
+
+def _process_month(file_path, month_name, month_num):
+    """
+    Read the transactions, income and category totals of one monthly Excel file
+    
+    This is a module-level function that only uses its arguments, so
+    load_data can run it in worker processes.
+    
+    Args:
+        file_path: Path of the Excel file
+        month_name: Display name of the month
+        month_num: Position of the month in month_names, starting at 1
+    
+    Returns:
+        (summary_row, trans_df, category_totals, errors) where summary_row is a
+        dict with one value per summary column and category_totals maps
+        category to expenses; all but errors are None if the file could not
+        be processed
+    """
+    import xlrd
+    
+    errors = []
+    logger.info("Processing %s...", file_path)
+    
+    if not os.path.exists(file_path):
+        error_msg = f"File not found: {file_path}"
+        errors.append(error_msg)
+        logger.error(error_msg)
+        return None, None, None, errors
+    
+    try:
+        # Open the workbook with xlrd
+        wb = xlrd.open_workbook(file_path)
+        logger.debug("  Available sheets: %s", wb.sheet_names())
+        
+        # Try to find the transactions sheet
+        trans_sheet = None
+        if len(wb.sheet_names()) >= 2:
+            trans_sheet = wb.sheet_by_index(1)  # Use the second sheet
+        elif 'Transactions' in wb.sheet_names():
+            trans_sheet = wb.sheet_by_name('Transactions')
+        elif wb.nsheets > 0:
+            trans_sheet = wb.sheet_by_index(0)  # Use the first sheet if no other option
+        
+        if trans_sheet is None:
+            error_msg = f"No sheets found in {file_path}"
+            errors.append(error_msg)
+            raise ValueError(error_msg)
+        
+        logger.debug("  Reading sheet: %s", trans_sheet.name)
+        
+        # Get column names from the first row
+        col_names = [trans_sheet.cell_value(0, col_idx) for col_idx in range(trans_sheet.ncols)]
+        logger.debug("  Column names: %s", col_names)
+        
+        # Create DataFrame from the sheet data one column at a time,
+        # skipping the header row
+        columns = {}
+        for col_idx, col_name in enumerate(col_names):
+            if not col_name:  # Skip empty column names
+                continue
+            values = trans_sheet.col_values(col_idx, start_rowx=1)
+            cell_types = trans_sheet.col_types(col_idx, start_rowx=1)
+            # Handle dates if cell type is XL_CELL_DATE
+            if xlrd.XL_CELL_DATE in cell_types:
+                values = _excel_date_column(values, cell_types, wb.datemode)
+            columns[col_name] = values
+        
+        trans_df = pd.DataFrame(columns)
+        
+        # Ensure Date column is properly converted to datetime if it exists
+        if 'Date' in trans_df.columns:
+            try:
+                trans_df['Date'] = pd.to_datetime(trans_df['Date'], errors='coerce')
+            except Exception as e:
+                logger.warning("  Error converting dates: %s", e)
+                # If conversion fails, at least ensure the column exists
+                if 'Date' not in trans_df.columns:
+                    trans_df['Date'] = datetime.now()
+        
+        # Add Month column 
+        trans_df['Month'] = month_name
+        
+        # Ensure all required columns exist
+        required_columns = ['Category', 'Amount', 'Label']
+        for col in required_columns:
+            if col not in trans_df.columns:
+                error_msg = f"Required column '{col}' not found in {file_path}"
+                errors.append(error_msg)
+                raise ValueError(error_msg)
+        
+        # Coerce Amount once here so everything downstream can rely on
+        # a float column; rows without a usable amount are dropped
+        trans_df['Amount'] = pd.to_numeric(trans_df['Amount'], errors='coerce')
+        trans_df = trans_df.dropna(subset=['Amount']).reset_index(drop=True)
+        
+        # Flag investment categories once for the checks below; each distinct
+        # category is checked once and code -1 (missing category) picks the
+        # trailing False
+        category_codes, categories = pd.factorize(trans_df['Category'])
+        is_investment = pd.Index(categories).astype(str).str.startswith('Investment')
+        investment_mask = np.append(is_investment, False)[category_codes]
+        
+        # Validate Label column values (must be N, W, or L)
+        if 'Label' in trans_df.columns:
+            # Convert to uppercase strings and handle NAs
+            trans_df['Label'] = trans_df['Label'].astype(str).str.upper()
+            
+            # Check for invalid labels; the offending values are only
+            # collected when there are any
+            invalid_mask = ~trans_df['Label'].isin(_VALID_LABEL_CODES)
+            if invalid_mask.any():
+                invalid_labels = trans_df.loc[invalid_mask, 'Label'].unique()
+                error_msg = f"Invalid label values found in {file_path}: {', '.join(invalid_labels)}"
+                errors.append(error_msg)
+                raise ValueError(error_msg)
+            
+            # Map short codes to full labels
+            trans_df['Label'] = trans_df['Label'].map(_LABEL_NAMES).fillna('')
+            
+        # Automatically assign 'Savings' label to investment transactions if not already labeled
+        if 'Category' in trans_df.columns:
+            trans_df.loc[investment_mask & (trans_df['Label'] == ''), 'Label'] = 'Savings'
+        
+        # Check for and add missing columns with defaults if needed
+        if 'Date' not in trans_df.columns:
+            logger.warning("  'Date' column not found in %s, adding default values", file_path)
+            # Create default dates for the month
+            trans_df['Date'] = datetime(2025, month_num, 1)
+        
+        if 'Description' not in trans_df.columns:
+            logger.warning("  'Description' column not found in %s, adding default values", file_path)
+            trans_df['Description'] = trans_df['Category'] + " expense"
+        
+        if 'Who' not in trans_df.columns:
+            logger.warning("  'Who' column not found in %s, adding default values", file_path)
+            trans_df['Who'] = 'Unknown'
+        
+        if 'Whom' not in trans_df.columns:
+            logger.warning("  'Whom' column not found in %s, adding default values", file_path)
+            trans_df['Whom'] = 'Vendor'
+        
+        # Store the repeated text columns as categoricals
+        trans_df = trans_df.astype({col: 'category' for col in CATEGORICAL_COLUMNS})
+        
+        # Slice the non-investment expenses once for the totals below
+        regular = trans_df.loc[~investment_mask, ['Category', 'Amount']]
+        
+        # Calculate total expenses (excluding investments)
+        regular_expenses = regular['Amount'].sum()
+        investment_amount = trans_df[investment_mask]['Amount'].sum()
+        
+        # Try to read income from cell O3 in the first sheet
+        try:
+            # Get the first sheet in the workbook
+            first_sheet = wb.sheet_by_index(0)
+            
+            # Read income from cell O3 (row 2, column 14 in 0-indexed system)
+            if first_sheet.ncols > 14 and first_sheet.nrows > 2:
+                income_cell_value = first_sheet.cell_value(2, 14)  # O3 in 0-indexed is (2,14)
+                # Convert to numeric if possible
+                try:
+                    income = float(income_cell_value)
+                    logger.debug("  Income read from cell O3: ₹%.2f", income)
+                except (ValueError, TypeError):
+                    # Fallback to formula if cell doesn't contain a valid number
+                    income = regular_expenses * 1.5
+                    logger.warning("  Could not convert O3 cell value '%s' to number, using calculated income: ₹%.2f", income_cell_value, income)
+            else:
+                # Sheet doesn't have enough rows/columns, use calculated income
+                income = regular_expenses * 1.5
+                logger.info("  First sheet doesn't have cell O3, using calculated income: ₹%.2f", income)
+        except Exception as e:
+            # Fallback to formula if there's any error reading the cell
+            income = regular_expenses * 1.5
+            logger.warning("  Error reading income from cell O3: %s, using calculated income: ₹%.2f", e, income)
+        
+        # Calculate surplus
+        surplus = income - regular_expenses
+        
+        # Group expenses by category (excluding investments)
+        category_totals_month = regular.groupby('Category', observed=True)['Amount'].sum()
+        
+        # Find top expense category
+        if not category_totals_month.empty:
+            top_category_name = category_totals_month.idxmax()
+            top_category_amount = category_totals_month.max()
+        else:
+            top_category_name = "Unknown"
+            top_category_amount = 0
+        
+        # Summary data for this month
+        summary_row = {
+            'Month': month_name,
+            'Total Income': income,
+            'Total Expenses': regular_expenses,
+            'Investments': investment_amount,
+            'Surplus': surplus,
+            'Top Expense Category': top_category_name,
+            'Top Expense Amount': top_category_amount
+        }
+        
+        logger.debug("  Income: ₹%.2f", income)
+        logger.debug("  Regular Expenses: ₹%.2f", regular_expenses)
+        logger.debug("  Investments: ₹%.2f", investment_amount)
+        logger.debug("  Surplus: ₹%.2f", surplus)
+        
+        return summary_row, trans_df, category_totals_month.to_dict(), errors
+        
+    except Exception as e:
+        error_msg = f"Error processing {file_path}: {str(e)}"
+        errors.append(error_msg)
+        logger.error(error_msg)
+        return None, None, None, errors
+
+def _process_months(file_paths, month_names, month_nums):
+    """
+    Run _process_month for each file
+    
+    The files are independent and parsing is CPU bound Python, so with at
+    least PARALLEL_MIN_FILES files (and more than one CPU) they are parsed
+    in worker processes. Workers always use the 'spawn' start method:
+    load_data runs in the threads of the Flask server, and forking a
+    threaded process can deadlock the child. Spawned workers import this
+    package afresh, so scripts that load data must guard their entry point
+    with if __name__ == '__main__'.
+    
+    Returns:
+        A list with the _process_month result of each file, in order
+    """
+    max_workers = min(len(file_paths), os.cpu_count() or 1)
+    if len(file_paths) >= PARALLEL_MIN_FILES and max_workers > 1:
+        try:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=configure_logging,
+                initargs=(logging.getLogger().getEffectiveLevel(),)
+            ) as executor:
+                return list(executor.map(_process_month, file_paths, month_names, month_nums))
+        except (OSError, BrokenProcessPool) as e:
+            logger.warning("Could not load files in parallel, loading them one by one: %s", e)
+    
+    return list(map(_process_month, file_paths, month_names, month_nums))
+
+def _month_cache_key(file_path, month_name, month_num):
+    """Get the _month_cache key of a file, or None if it can't be stat'ed"""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return (file_path, month_name, month_num, stat.st_size, stat.st_mtime_ns)
+
+def _concat_transactions(frames):
+    """
+    Concatenate the monthly transaction DataFrames
+    
+    Categoricals with different categories concatenate to object columns,
+    so each categorical column is first given the union of all months'
+    categories.
+    
+    Args:
+        frames: List of transaction DataFrames from _process_month
+    
+    Returns:
+        A DataFrame with CATEGORICAL_COLUMNS as categoricals
+    """
+    dtypes = {}
+    for col in CATEGORICAL_COLUMNS:
+        try:
+            categories = union_categoricals([frame[col] for frame in frames], sort_categories=True).categories
+        except TypeError:
+            # Categories of mixed types (e.g. numbers and text) can't be
+            # combined; the column is converted after concatenating instead
+            continue
+        dtypes[col] = pd.CategoricalDtype(categories)
+    
+    all_trans_df = pd.concat([frame.astype(dtypes) for frame in frames], ignore_index=True)
+    return all_trans_df.astype({col: 'category' for col in CATEGORICAL_COLUMNS if col not in dtypes})
+
 def load_data():
     """
     Load and process Excel files from the data directory
-    Returns summary_df, all_transactions_df, category_monthly_df
+    Returns a LoadResult
     """
     # Get the data directory and Excel files
     data_dir = get_data_dir()
-    print("Loading data from {}".format(data_dir))
+    logger.info("Loading data from %s", data_dir)
     
     # Get excel files and extract month names
-    global months, month_names, dashboard_errors
-    excel_files = [f for f in os.listdir(data_dir) if f.endswith('.xlsx')]
+    global _month_cache
+    excel_files = _list_xlsx_files(data_dir)
     
-    # Reset global month lists
     months = []
     month_names = []
     
@@ -56,72 +469,23 @@ def load_data():
         month = os.path.splitext(file)[0]
         months.append(month)
         
-        # Convert abbreviated months to full names for display
-        if month == "Jan": 
-            month_name = "January"
-        elif month == "Feb":
-            month_name = "February"
-        elif month == "Mar" or month == "March":
-            month_name = "March"
-        elif month == "Apr" or month == "April":
-            month_name = "April"
-        elif month == "May":
-            month_name = "May"
-        elif month == "Jun" or month == "June":
-            month_name = "June"
-        elif month == "Jul" or month == "July":
-            month_name = "July"
-        elif month == "Aug" or month == "August":
-            month_name = "August"
-        elif month == "Sep" or month == "Sept" or month == "September":
-            month_name = "September"
-        elif month == "Oct" or month == "October":
-            month_name = "October"
-        elif month == "Nov" or month == "November":
-            month_name = "November"
-        elif month == "Dec" or month == "December":
-            month_name = "December"
-        else:
-            # If no match, use the file name as is
-            month_name = month
-            
+        # Convert abbreviated months to full names for display; if there is
+        # no match, use the file name as is
+        month_name = _MONTH_NAME_MAP.get(month, month)
+        
         month_names.append(month_name)
     
-    # Sort months chronologically if possible
-    month_order = {
-        "January": 1, "February": 2, "March": 3, "April": 4,
-        "May": 5, "June": 6, "July": 7, "August": 8,
-        "September": 9, "October": 10, "November": 11, "December": 12
-    }
+    # Sort months chronologically; names that aren't months go last, in
+    # their original order
+    pairs = sorted(zip(months, month_names), key=lambda pair: _MONTH_ORDER.get(pair[1], 13))
+    months = [month for month, _ in pairs]
+    month_names = [month_name for _, month_name in pairs]
     
-    if month_names:
-        # Create pairs of (month_file, month_name) for sorting
-        pairs = list(zip(months, month_names))
-        
-        # Try to sort by month order
-        try:
-            sorted_pairs = sorted(pairs, key=lambda pair: month_order.get(pair[1], 13))
-            months, month_names = zip(*sorted_pairs)
-            # Convert back to lists
-            months = list(months)
-            month_names = list(month_names)
-        except:
-            # If sorting fails, keep original order
-            pass
-    
-    # Lists to store processed data
-    summary_data = {
-        'Month': [],
-        'Total Income': [],
-        'Total Expenses': [],
-        'Investments': [],
-        'Surplus': [],
-        'Top Expense Category': [],
-        'Top Expense Amount': []
-    }
-    
-    # Dictionary to store transactions by month
-    all_transactions = {}
+    # List of each month's summary row, in month order
+    summary_rows = []
+    
+    # List of each month's transactions, in month order
+    all_transactions = []
     
     # Dictionary to store category expenses by month
     category_monthly = {}
@@ -132,251 +496,78 @@ def load_data():
     # Try to use xlrd for reading Excel files
     try:
         import xlrd
-        print(f"Using xlrd version {xlrd.__VERSION__} to read Excel files...")
+        logger.debug("Using xlrd version %s to read Excel files...", xlrd.__VERSION__)
         
-        # Process each file
-        for month, month_name in zip(months, month_names):
-            file_path = os.path.join(data_dir, f"{month}.xlsx")
-            print(f"Processing {file_path}...")
-            
-            if not os.path.exists(file_path):
-                error_msg = f"File not found: {file_path}"
-                errors.append(error_msg)
-                print(error_msg)
+        file_paths = [os.path.join(data_dir, f"{month}.xlsx") for month in months]
+        month_nums = range(1, len(month_names) + 1)
+        cache_keys = [_month_cache_key(*args) for args in zip(file_paths, month_names, month_nums)]
+        
+        # Only parse the files that changed since the last load
+        results = [_month_cache.get(key) for key in cache_keys]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if len(pending) < len(results):
+            logger.info("Reusing %d unchanged files", len(results) - len(pending))
+        
+        parsed = _process_months(
+            [file_paths[i] for i in pending],
+            [month_names[i] for i in pending],
+            [month_nums[i] for i in pending]
+        )
+        for i, result in zip(pending, parsed):
+            results[i] = result
+        
+        # Keep the files that loaded successfully for the next load
+        _month_cache = {
+            key: result for key, result in zip(cache_keys, results)
+            if key is not None and result[1] is not None
+        }
+        
+        # Combine the results in month order
+        for month_name, (summary_row, trans_df, category_totals, file_errors) in zip(month_names, results):
+            errors.extend(file_errors)
+            if trans_df is None:
                 continue
             
-            try:
-                # Open the workbook with xlrd
-                wb = xlrd.open_workbook(file_path)
-                print(f"  Available sheets: {wb.sheet_names()}")
-                
-                # Try to find the transactions sheet
-                trans_sheet = None
-                if len(wb.sheet_names()) >= 2:
-                    trans_sheet = wb.sheet_by_index(1)  # Use the second sheet
-                elif 'Transactions' in wb.sheet_names():
-                    trans_sheet = wb.sheet_by_name('Transactions')
-                elif wb.nsheets > 0:
-                    trans_sheet = wb.sheet_by_index(0)  # Use the first sheet if no other option
-                
-                if trans_sheet is None:
-                    error_msg = f"No sheets found in {file_path}"
-                    errors.append(error_msg)
-                    raise ValueError(error_msg)
-                
-                print(f"  Reading sheet: {trans_sheet.name}")
-                
-                # Get column names from the first row
-                col_names = [trans_sheet.cell_value(0, col_idx) for col_idx in range(trans_sheet.ncols)]
-                print(f"  Column names: {col_names}")
-                
-                # Create DataFrame from the sheet data
-                data = []
-                for row_idx in range(1, trans_sheet.nrows):  # Skip header row
-                    row_dict = {}
-                    for col_idx, col_name in enumerate(col_names):
-                        if col_name:  # Skip empty column names
-                            cell_value = trans_sheet.cell_value(row_idx, col_idx)
-                            # Handle dates if cell type is XL_CELL_DATE
-                            if trans_sheet.cell_type(row_idx, col_idx) == xlrd.XL_CELL_DATE:
-                                date_tuple = xlrd.xldate_as_tuple(cell_value, wb.datemode)
-                                # Convert to datetime 
-                                from datetime import datetime
-                                cell_value = datetime(*date_tuple)
-                            row_dict[col_name] = cell_value
-                    data.append(row_dict)
-                
-                trans_df = pd.DataFrame(data)
-                
-                # Ensure Date column is properly converted to datetime if it exists
-                if 'Date' in trans_df.columns:
-                    try:
-                        trans_df['Date'] = pd.to_datetime(trans_df['Date'], errors='coerce')
-                    except Exception as e:
-                        print(f"  Warning: Error converting dates: {e}")
-                        # If conversion fails, at least ensure the column exists
-                        if 'Date' not in trans_df.columns:
-                            from datetime import datetime
-                            trans_df['Date'] = datetime.now()
-                
-                # Add Month column 
-                trans_df['Month'] = month_name
-                
-                # Ensure all required columns exist
-                required_columns = ['Category', 'Amount', 'Label']
-                for col in required_columns:
-                    if col not in trans_df.columns:
-                        error_msg = f"Required column '{col}' not found in {file_path}"
-                        errors.append(error_msg)
-                        raise ValueError(error_msg)
-                
-                # Validate Label column values (must be N, W, or L)
-                if 'Label' in trans_df.columns:
-                    # Convert to uppercase strings and handle NAs
-                    trans_df['Label'] = trans_df['Label'].astype(str).str.upper()
-                    
-                    # Map the short codes to full labels
-                    label_mapping = {
-                        'N': 'Needs',
-                        'W': 'Wants',
-                        'L': 'Luxury',
-                        'S': 'Savings',
-                        'I': 'Investment'
-                    }
-                    
-                    # Check for invalid labels
-                    valid_labels = list(label_mapping.keys())
-                    invalid_labels = trans_df[~trans_df['Label'].isin(valid_labels + ['NAN', 'NONE', ''])]['Label'].unique()
-                    
-                    if len(invalid_labels) > 0:
-                        error_msg = f"Invalid label values found in {file_path}: {', '.join(invalid_labels)}"
-                        errors.append(error_msg)
-                        raise ValueError(error_msg)
-                    
-                    # Map short codes to full labels
-                    trans_df['Label'] = trans_df['Label'].map(lambda x: label_mapping.get(x, '') if x in valid_labels else '')
-                    
-                # Automatically assign 'Savings' label to investment transactions if not already labeled
-                if 'Category' in trans_df.columns:
-                    investment_mask = trans_df['Category'].astype(str).str.startswith('Investment') & (trans_df['Label'] == '')
-                    trans_df.loc[investment_mask, 'Label'] = 'Savings'
-                
-                # Check for and add missing columns with defaults if needed
-                if 'Date' not in trans_df.columns:
-                    print(f"  Warning: 'Date' column not found in {file_path}, adding default values")
-                    # Create default dates for the month
-                    month_num = month_names.index(month_name) + 1
-                    from datetime import datetime
-                    trans_df['Date'] = datetime(2025, month_num, 1)
-                
-                if 'Description' not in trans_df.columns:
-                    print(f"  Warning: 'Description' column not found in {file_path}, adding default values")
-                    trans_df['Description'] = trans_df['Category'] + " expense"
-                
-                if 'Who' not in trans_df.columns:
-                    print(f"  Warning: 'Who' column not found in {file_path}, adding default values")
-                    trans_df['Who'] = 'Unknown'
-                
-                if 'Whom' not in trans_df.columns:
-                    print(f"  Warning: 'Whom' column not found in {file_path}, adding default values")
-                    trans_df['Whom'] = 'Vendor'
-                
-                # Store transactions
-                all_transactions[month_name] = trans_df
-                
-                # Calculate total expenses (excluding investments)
-                investment_mask = trans_df['Category'].astype(str).str.startswith('Investment')
-                regular_expenses = trans_df[~investment_mask]['Amount'].sum()
-                investment_amount = trans_df[investment_mask]['Amount'].sum()
-                
-                # Try to read income from cell O3 in the first sheet
-                try:
-                    # Get the first sheet in the workbook
-                    first_sheet = wb.sheet_by_index(0)
-                    
-                    # Read income from cell O3 (row 2, column 14 in 0-indexed system)
-                    if first_sheet.ncols > 14 and first_sheet.nrows > 2:
-                        income_cell_value = first_sheet.cell_value(2, 14)  # O3 in 0-indexed is (2,14)
-                        # Convert to numeric if possible
-                        try:
-                            income = float(income_cell_value)
-                            print(f"  Income read from cell O3: ₹{income:.2f}")
-                        except (ValueError, TypeError):
-                            # Fallback to formula if cell doesn't contain a valid number
-                            income = regular_expenses * 1.5
-                            print(f"  Could not convert O3 cell value '{income_cell_value}' to number, using calculated income: ₹{income:.2f}")
-                    else:
-                        # Sheet doesn't have enough rows/columns, use calculated income
-                        income = regular_expenses * 1.5
-                        print(f"  First sheet doesn't have cell O3, using calculated income: ₹{income:.2f}")
-                except Exception as e:
-                    # Fallback to formula if there's any error reading the cell
-                    income = regular_expenses * 1.5
-                    print(f"  Error reading income from cell O3: {str(e)}, using calculated income: ₹{income:.2f}")
-                
-                # Calculate surplus
-                surplus = income - regular_expenses
-                
-                # Group expenses by category (excluding investments)
-                category_expenses_month = trans_df[~investment_mask].groupby('Category')['Amount'].sum().to_dict()
-                category_monthly[month_name] = category_expenses_month
-                
-                # Find top expense category
-                if not trans_df[~investment_mask].empty:
-                    top_category_series = trans_df[~investment_mask].groupby('Category')['Amount'].sum()
-                    top_category_name = top_category_series.idxmax() if not top_category_series.empty else "Unknown"
-                    top_category_amount = top_category_series.max() if not top_category_series.empty else 0
-                else:
-                    top_category_name = "Unknown"
-                    top_category_amount = 0
-                
-                # Store summary data
-                summary_data['Month'].append(month_name)
-                summary_data['Total Income'].append(income)
-                summary_data['Total Expenses'].append(regular_expenses)
-                summary_data['Investments'].append(investment_amount)
-                summary_data['Surplus'].append(surplus)
-                summary_data['Top Expense Category'].append(top_category_name)
-                summary_data['Top Expense Amount'].append(top_category_amount)
-                
-                print(f"  Income: ₹{income:.2f}")
-                print(f"  Regular Expenses: ₹{regular_expenses:.2f}")
-                print(f"  Investments: ₹{investment_amount:.2f}")
-                print(f"  Surplus: ₹{surplus:.2f}")
-                
-            except Exception as e:
-                error_msg = f"Error processing {file_path}: {str(e)}"
-                errors.append(error_msg)
-                print(error_msg)
+            all_transactions.append(trans_df)
+            category_monthly[month_name] = category_totals
+            summary_rows.append(summary_row)
     
     except Exception as e:
         error_msg = f"Error initializing xlrd: {str(e)}"
         errors.append(error_msg)
-        print(error_msg)
+        logger.error(error_msg)
     
     # If we couldn't load any data, return empty DataFrames and error messages
     if not all_transactions:
         error_msg = "Failed to load any data from Excel files. Please check file format and try again."
         errors.append(error_msg)
-        print(error_msg)
+        logger.error(error_msg)
         
         # Create empty DataFrames
-        summary_df = pd.DataFrame(columns=['Month', 'Total Income', 'Total Expenses', 'Investments', 'Surplus', 'Top Expense Category', 'Top Expense Amount'])
+        summary_df = pd.DataFrame(columns=SUMMARY_COLUMNS)
         all_trans_df = pd.DataFrame(columns=['Date', 'Description', 'Category', 'Amount', 'Who', 'Whom', 'Month', 'Label'])
         monthly_category_df = pd.DataFrame(columns=['Category'] + month_names)
         
-        # Pass errors as global variable to be displayed in the dashboard
-        global dashboard_errors
-        dashboard_errors = errors
-        
-        return summary_df, all_trans_df, monthly_category_df
+        return LoadResult(summary_df, all_trans_df, monthly_category_df, months, month_names, errors)
     
     # Create summary DataFrame from real data
-    summary_df = pd.DataFrame(summary_data)
+    summary_df = pd.DataFrame.from_records(summary_rows, columns=SUMMARY_COLUMNS)
     
     # Combine all transactions into a single DataFrame
-    all_trans_df = pd.concat(all_transactions.values(), ignore_index=True)
-    
-    # Create category analysis
-    # First, get all unique categories
-    all_categories = set()
-    for month_expenses in category_monthly.values():
-        all_categories.update(month_expenses.keys())
-    
-    # Create DataFrame with months as columns
-    monthly_category_data = []
-    for category in sorted(all_categories):
-        row = {'Category': category}
-        for month in month_names:
-            if month in category_monthly and category in category_monthly[month]:
-                row[month] = category_monthly[month][category]
-            else:
-                row[month] = 0
-        monthly_category_data.append(row)
+    all_trans_df = _concat_transactions(all_transactions)
     
-    monthly_category_df = pd.DataFrame(monthly_category_data)
+    # Create category analysis from the per-month category totals, with
+    # one row per category and months as columns (0 where a category has
+    # no expenses in a month)
+    monthly_category_df = (
+        pd.DataFrame(category_monthly, columns=month_names, dtype=float)
+        .fillna(0)
+        .sort_index()
+        .rename_axis('Category')
+        .reset_index()
+    )
     
-    return summary_df, all_trans_df, monthly_category_df
+    return LoadResult(summary_df, all_trans_df, monthly_category_df, months, month_names, errors)
 
 def process_upload(contents, filename, date, data_dir=None):
     """
@@ -395,18 +586,27 @@ def process_upload(contents, filename, date, data_dir=None):
         return False, f"Error: {filename} is not an Excel file. Only .xlsx files are supported."
             
     try:
-        # Decode content
         content_type, content_string = contents.split(',')
-        decoded = base64.b64decode(content_string)
         
         # Get data directory if not provided
         if data_dir is None:
             data_dir = get_data_dir()
         
-        # Save file to data directory
+        # Decode the content a chunk at a time while saving it to the data
+        # directory, so the decoded file is never held in memory as a whole.
+        # It is written under a temporary name first so that a failed
+        # upload doesn't leave a partial file behind
         file_path = os.path.join(data_dir, filename)
-        with open(file_path, 'wb') as f:
-            f.write(decoded)
+        part_path = file_path + '.part'
+        try:
+            with open(part_path, 'wb') as f:
+                for start in range(0, len(content_string), UPLOAD_CHUNK_CHARS):
+                    f.write(base64.b64decode(content_string[start:start + UPLOAD_CHUNK_CHARS]))
+            os.replace(part_path, file_path)
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+        clear_excel_files_cache()
         
         timestamp = datetime.fromtimestamp(date/1000).strftime('%Y-%m-%d %H:%M:%S')
         return True, f"Uploaded: {filename} ({timestamp})"
@@ -0,0 +1,326 @@
+"""
+Preparation and caching of transaction data used by the dashboard callbacks
+"""
+import hashlib
+import logging
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import orjson
+import pandas as pd
+
+# pyarrow is optional; it is only used for faster CSV writing
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Number of prepared store versions to keep around
+PREPARED_CACHE_SIZE = 4
+
+# Labels shown in the Needs/Wants/Luxury analysis
+NWL_LABELS = ['Needs', 'Wants', 'Luxury']
+
+# Prepared DataFrames and their aggregates keyed by a fingerprint of the
+# store contents, so that every callback fired by the same store update
+# shares one conversion and one set of groupbys
+_prepared_cache = {}
+_prepared_lock = threading.Lock()
+
+def prepare_transactions(df):
+    """
+    Coerce transaction columns to the dtypes used by the charts and tables
+    
+    Amount becomes float64 (unparseable values become NaN), Date becomes
+    datetime64, Category, Label, Who and Whom become categoricals and Month becomes an
+    ordered categorical that follows the order months appear in the data.
+    IsInvestment is added to flag categories starting with 'Investment'.
+    
+    Args:
+        df: DataFrame of transactions
+    
+    Returns:
+        A new DataFrame; the input is not modified
+    """
+    df = df.copy()
+    
+    if 'Amount' in df.columns:
+        df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce')
+    
+    if 'Date' in df.columns:
+        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    
+    for col in ('Category', 'Label', 'Who', 'Whom'):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    
+    if 'Category' in df.columns:
+        # Check each category once instead of every row; code -1 (missing
+        # category) picks the trailing False
+        is_investment = df['Category'].cat.categories.astype(str).str.startswith('Investment')
+        df['IsInvestment'] = np.append(is_investment, False)[df['Category'].cat.codes.to_numpy()]
+    
+    if 'Month' in df.columns:
+        month_order = pd.unique(df['Month'].dropna())
+        df['Month'] = pd.Categorical(df['Month'], categories=month_order, ordered=True)
+    
+    return df
+
+def nwl_subset(label_totals):
+    """
+    Keep only the Needs/Wants/Luxury rows of a label aggregate
+    
+    Label is narrowed to a categorical of just those three labels, so later
+    pivots and groupbys on it work with three codes.
+    
+    Args:
+        label_totals: DataFrame with a Label column
+    
+    Returns:
+        A new DataFrame
+    """
+    nwl = label_totals[label_totals['Label'].isin(NWL_LABELS)]
+    return nwl.assign(Label=pd.Categorical(nwl['Label'], categories=NWL_LABELS))
+
+def nwl_category_matrix(df):
+    """
+    Sum Amount per Category for each of the Needs/Wants/Luxury labels
+    
+    The Category and Label codes are combined into one flat index and summed
+    with a single np.bincount, instead of a groupby over both columns.
+    
+    Args:
+        df: A prepared DataFrame of labeled transactions with valid Amounts
+    
+    Returns:
+        A DataFrame indexed by Category with one column per NWL label, holding
+        only the categories that have N/W/L transactions
+    """
+    categories = df['Category'].cat.categories
+    category_codes = df['Category'].cat.codes.to_numpy()
+    label_codes = pd.Categorical(df['Label'], categories=NWL_LABELS).codes
+    
+    # Skip rows without a category or with a label outside N/W/L
+    valid = (category_codes >= 0) & (label_codes >= 0)
+    flat = category_codes[valid].astype(np.intp) * len(NWL_LABELS) + label_codes[valid]
+    size = len(categories) * len(NWL_LABELS)
+    
+    totals = np.bincount(flat, weights=df['Amount'].to_numpy()[valid], minlength=size)
+    present = np.bincount(flat, minlength=size).reshape(-1, len(NWL_LABELS)).any(axis=1)
+    
+    matrix = pd.DataFrame(
+        totals.reshape(-1, len(NWL_LABELS)),
+        index=pd.CategoricalIndex(categories, categories=categories, name='Category'),
+        columns=pd.Index(NWL_LABELS, name='Label')
+    )
+    return matrix[present]
+
+def compute_aggregates(df):
+    """
+    Compute the groupby aggregates used by the store-driven charts
+    
+    Args:
+        df: A prepared DataFrame (see prepare_transactions)
+    
+    Returns:
+        A SimpleNamespace holding the prepared DataFrame as df, flags for
+        whether any labeled (has_labeled) or N/W/L (has_nwl) transactions
+        exist, and the aggregate DataFrames. Aggregates whose source
+        columns are missing are None. signatures caches the results of
+        get_column_signature.
+    """
+    columns = set(df.columns)
+    aggs = SimpleNamespace(
+        df=df,
+        has_labeled=False,
+        has_nwl=False,
+        by_person=None,
+        by_month_person=None,
+        by_label=None,
+        by_month_label=None,
+        by_category_label=None,
+        nwl_by_label=None,
+        nwl_by_month_label=None,
+        nwl_by_category_label=None,
+        nwl_category_matrix=None,
+        signatures={}
+    )
+    
+    if {'Who', 'Amount'} <= columns:
+        aggs.by_person = df.groupby('Who', observed=True, sort=False)['Amount'].sum().reset_index()
+        if 'Month' in columns:
+            aggs.by_month_person = df.groupby(['Month', 'Who'], observed=True)['Amount'].sum().reset_index()
+    
+    if {'Label', 'Amount'} <= columns:
+        # Skip transactions without a label
+        labeled_mask = df['Label'].notna() & (df['Label'] != '')
+        aggs.has_labeled = bool(labeled_mask.any())
+        aggs.has_nwl = bool(df.loc[labeled_mask, 'Label'].isin(NWL_LABELS).any())
+        
+        # Only sum transactions with a valid Amount
+        labeled = df[labeled_mask & df['Amount'].notna()]
+        aggs.by_label = labeled.groupby('Label', observed=True, sort=False)['Amount'].sum().reset_index()
+        aggs.nwl_by_label = nwl_subset(aggs.by_label)
+        
+        if 'Month' in columns:
+            aggs.by_month_label = labeled.groupby(['Month', 'Label'], observed=True)['Amount'].sum().reset_index()
+            aggs.nwl_by_month_label = nwl_subset(aggs.by_month_label)
+        
+        if 'Category' in columns:
+            aggs.by_category_label = labeled.groupby(['Category', 'Label'], observed=True)['Amount'].sum().reset_index()
+            aggs.nwl_by_category_label = nwl_subset(aggs.by_category_label)
+            aggs.nwl_category_matrix = nwl_category_matrix(labeled)
+    
+    return aggs
+
+def _largest_positions(values, n):
+    """Get the positions of the n largest values, largest first"""
+    k = min(n, len(values))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    
+    idx = np.argpartition(-values, k - 1)[:k]
+    return idx[np.argsort(-values[idx])]
+
+def largest_rows(df, column, n=10):
+    """
+    Get the n rows with the largest values in a column, largest first
+    
+    Uses a partial sort so only the selected rows are fully sorted.
+    
+    Args:
+        df: DataFrame to select from
+        column: Numeric column to rank by
+        n: Maximum number of rows to return
+    
+    Returns:
+        A DataFrame with at most n rows
+    """
+    return df.iloc[_largest_positions(df[column].to_numpy(), n)]
+
+def largest_index(series, n=10):
+    """
+    Get the index labels of the n largest values of a Series, largest first
+    
+    Like series.nlargest(n).index, but with a partial sort.
+    
+    Args:
+        series: Numeric Series to rank
+        n: Maximum number of labels to return
+    
+    Returns:
+        An Index with at most n labels
+    """
+    return series.index[_largest_positions(series.to_numpy(), n)]
+
+def write_transactions_csv(df, csv_path):
+    """
+    Write transactions to a CSV file without the index
+    
+    Uses pyarrow's CSV writer when pyarrow is installed and falls back to
+    DataFrame.to_csv otherwise.
+    
+    Args:
+        df: DataFrame of transactions
+        csv_path: Path of the CSV file to write
+    """
+    if pa is not None:
+        try:
+            pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), csv_path)
+            return
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+            # Mixed-type object columns can't be converted; use pandas instead
+            logger.warning("Falling back to pandas CSV writer: %s", e)
+    
+    df.to_csv(csv_path, index=False)
+
+def get_column_signature(aggs, columns):
+    """
+    Get a content hash of some columns of the prepared transactions
+    
+    Lets a chart tell whether the data it depends on changed, e.g. a label
+    edit changes the Label column but not the Who/Amount data of the
+    person charts.
+    
+    Args:
+        aggs: A SimpleNamespace from get_transaction_aggregates
+        columns: Columns the chart uses; missing ones are ignored
+    
+    Returns:
+        A hashable signature
+    """
+    columns = tuple(col for col in columns if col in aggs.df.columns)
+    signature = aggs.signatures.get(columns)
+    
+    if signature is None:
+        row_hashes = pd.util.hash_pandas_object(aggs.df[list(columns)], index=False)
+        signature = (len(aggs.df), columns, int(row_hashes.sum()))
+        aggs.signatures[columns] = signature
+    
+    return signature
+
+def transactions_to_store(df):
+    """
+    Convert transactions to the column-oriented data kept in transactions-store
+    
+    Each row is a list of values in column order, so column names are only
+    sent once instead of once per row.
+    
+    Args:
+        df: DataFrame of transactions
+    
+    Returns:
+        A dict with 'columns' (list of names) and 'data' (list of rows)
+    """
+    # Same as to_dict('split', index=False), which needs pandas 2.0
+    return {'columns': df.columns.tolist(), 'data': df.astype(object).values.tolist()}
+
+def store_to_transactions(transactions_data):
+    """
+    Convert transactions-store data back to a DataFrame
+    
+    Args:
+        transactions_data: The store data (see transactions_to_store)
+    
+    Returns:
+        A DataFrame, empty if the store is empty
+    """
+    if not transactions_data:
+        return pd.DataFrame()
+    return pd.DataFrame(transactions_data['data'], columns=transactions_data['columns'])
+
+def store_fingerprint(transactions_data):
+    """Return a content hash of the transactions store data"""
+    payload = orjson.dumps(transactions_data, default=str)
+    return hashlib.md5(payload).hexdigest()
+
+def get_transaction_aggregates(transactions_data):
+    """
+    Get the prepared DataFrame and aggregates for the transactions store data
+    
+    The result is shared between callbacks and must not be modified in place.
+    
+    Args:
+        transactions_data: The transactions store data (see transactions_to_store)
+    
+    Returns:
+        A SimpleNamespace (see compute_aggregates)
+    """
+    key = store_fingerprint(transactions_data)
+    
+    with _prepared_lock:
+        aggs = _prepared_cache.get(key)
+    
+    if aggs is None:
+        aggs = compute_aggregates(prepare_transactions(store_to_transactions(transactions_data)))
+        with _prepared_lock:
+            # Evict the oldest entry once the cache is full
+            if len(_prepared_cache) >= PREPARED_CACHE_SIZE:
+                _prepared_cache.pop(next(iter(_prepared_cache)))
+            _prepared_cache[key] = aggs
+    
+    return aggs
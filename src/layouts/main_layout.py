@@ -4,18 +4,30 @@ Main layout for the budget dashboard
 import dash_bootstrap_components as dbc
 from dash import html, dcc, dash_table
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
-from ..data.loader import has_excel_files, get_excel_files, dashboard_errors
+from ..data.loader import has_excel_files, get_excel_files
 from ..components.cards import (
     create_ytd_summary_cards,
     create_monthly_averages_cards,
     create_financial_planning_cards
 )
+from ..components.charts import create_base_figure
+from ..data.transactions import transactions_to_store
 from ..utils.helpers import format_inr
 
-def create_file_upload_section():
-    """Create the file upload section of the dashboard"""
+def create_file_upload_section(files_present):
+    """
+    Create the file upload section of the dashboard
+    
+    Args:
+        files_present: Whether the data directory has Excel files; the
+            "No Excel Files Found" message is hidden if it does
+    
+    Returns:
+        A dbc.Row component
+    """
     return dbc.Row([
         dbc.Col([
             html.H4("Upload Excel Files", className="text-center mb-2"),
@@ -85,7 +97,7 @@ def create_file_upload_section():
                     )
                 ],
                 id="no-files-message",
-                style={'display': 'none' if has_excel_files() else 'block', 'marginTop': '20px'}
+                style={'display': 'none' if files_present else 'block', 'marginTop': '20px'}
             ),
             
             # Refresh button
@@ -96,7 +108,7 @@ def create_file_upload_section():
         ], width=12)
     ])
 
-def create_error_container():
+def create_error_container(errors):
     """Create the error container for displaying data loading errors"""
     return dbc.Row([
         dbc.Col([
@@ -104,7 +116,7 @@ def create_error_container():
                 [
                     html.H4("Error: Unable to Load Data", className="text-danger"),
                     html.P("The following errors occurred while trying to read the Excel files:"),
-                    html.Ul([html.Li(error) for error in dashboard_errors]),
+                    html.Ul([html.Li(error) for error in errors]),
                     html.Hr(),
                     html.P([
                         "Troubleshooting steps:",
@@ -118,7 +130,7 @@ def create_error_container():
                 ],
                 id="error-container",
                 style={
-                    'display': 'block' if dashboard_errors else 'none',
+                    'display': 'block' if errors else 'none',
                     'backgroundColor': '#ffeeee',
                     'padding': '15px',
                     'borderRadius': '5px',
@@ -144,7 +156,7 @@ def create_toast_container():
         ]
     )
 
-def create_layout(summary_df, all_transactions_df, category_monthly_df, month_names=[]):
+def create_layout(summary_df, all_transactions_df, category_monthly_df, month_names=[], errors=[]):
     """
     Create the main layout for the dashboard application
     
@@ -153,17 +165,14 @@ def create_layout(summary_df, all_transactions_df, category_monthly_df, month_na
         all_transactions_df: DataFrame containing all transactions
         category_monthly_df: DataFrame containing category expenses by month
         month_names: List of month names
+        errors: Errors from loading the data; shown only if no data could be loaded
         
     Returns:
         A dbc.Container component containing the full dashboard layout
     """
     # Get unique people and categories for dropdown options, removing null values
-    if not all_transactions_df.empty:
-        unique_people = [person for person in all_transactions_df['Who'].unique() if person is not None and pd.notna(person)]
-        unique_categories = [cat for cat in all_transactions_df['Category'].unique() if cat is not None and pd.notna(cat)]
-    else:
-        unique_people = []
-        unique_categories = []
+    unique_people = all_transactions_df['Who'].dropna().unique().tolist() if 'Who' in all_transactions_df.columns else []
+    unique_categories = all_transactions_df['Category'].dropna().unique().tolist() if 'Category' in all_transactions_df.columns else []
     
     # Create transaction label options
     label_options = [
@@ -174,11 +183,21 @@ def create_layout(summary_df, all_transactions_df, category_monthly_df, month_na
         {'label': 'Investment (I)', 'value': 'Investment'}
     ]
     
+    # Check the data directory once for both the upload section and the dashboard
+    files_present = has_excel_files()
+    
+    # Dropdown options shared by the tabs
+    month_options = [{'label': month, 'value': month} for month in month_names]
+    category_options = [{'label': cat, 'value': cat} for cat in unique_categories]
+    all_month_options = [{'label': 'All Months', 'value': 'all'}] + month_options
+    all_category_options = [{'label': 'All Categories', 'value': 'all'}] + category_options
+    all_people_options = [{'label': 'All People', 'value': 'all'}] + [{'label': person, 'value': person} for person in unique_people]
+    
     # Calculate YTD values
-    ytd_income = summary_df['Total Income'].sum() if not summary_df.empty else 0
-    ytd_expenses = summary_df['Total Expenses'].sum() if not summary_df.empty else 0
-    ytd_investments = summary_df['Investments'].sum() if not summary_df.empty else 0
-    ytd_surplus = summary_df['Surplus'].sum() if not summary_df.empty else 0
+    if summary_df.empty:
+        ytd_income = ytd_expenses = ytd_investments = ytd_surplus = 0
+    else:
+        ytd_income, ytd_expenses, ytd_investments, ytd_surplus = summary_df[['Total Income', 'Total Expenses', 'Investments', 'Surplus']].sum(axis=0).tolist()
     
     # Calculate averages, preventing division by zero
     month_count = max(1, len(month_names))  # Ensure at least 1 to prevent division by zero
@@ -193,12 +212,12 @@ def create_layout(summary_df, all_transactions_df, category_monthly_df, month_na
     
     # If we have labeled data, calculate based on actual "Needs" transactions
     if not all_transactions_df.empty and 'Label' in all_transactions_df.columns:
-        # Get transactions labeled as 'Needs'
-        needs_transactions = all_transactions_df[all_transactions_df['Label'] == 'Needs']
+        # Get the month and amount of transactions labeled as 'Needs'
+        needs_transactions = all_transactions_df.loc[all_transactions_df['Label'].eq('Needs'), ['Month', 'Amount']]
         
         if not needs_transactions.empty:
             # Calculate monthly needs by first grouping by month
-            monthly_needs = needs_transactions.groupby('Month')['Amount'].sum()
+            monthly_needs = needs_transactions.groupby('Month', observed=True, sort=False)['Amount'].sum()
             
             # Calculate the average of monthly needs (average across months)
             if len(monthly_needs) > 0:
@@ -211,24 +230,29 @@ def create_layout(summary_df, all_transactions_df, category_monthly_df, month_na
             # Calculate emergency fund suggestion (6 times monthly needs)
             emergency_fund_suggestion = avg_monthly_needs * 6
     
-    # Find highest/lowest months safely
-    if not summary_df.empty and len(summary_df) > 0:
-        # Only try to find max/min values if we have data
-        try:
-            highest_expense_month = summary_df.loc[summary_df['Total Expenses'].idxmax(), 'Month']
-            highest_expense_amount = summary_df['Total Expenses'].max()
-            highest_surplus_month = summary_df.loc[summary_df['Surplus'].idxmax(), 'Month']
-            highest_surplus_amount = summary_df['Surplus'].max()
-            highest_investment_month = summary_df.loc[summary_df['Investments'].idxmax(), 'Month'] 
-            highest_investment_amount = summary_df['Investments'].max()
-            lowest_expense_month = summary_df.loc[summary_df['Total Expenses'].idxmin(), 'Month']
-            lowest_expense_amount = summary_df['Total Expenses'].min()
-            top_expense_category = summary_df.loc[summary_df['Top Expense Amount'].idxmax(), 'Top Expense Category'] if summary_df['Top Expense Amount'].notna().any() else 'Unknown'
-        except:
-            # If anything fails, use defaults
-            highest_expense_month = highest_surplus_month = highest_investment_month = lowest_expense_month = 'Unknown'
-            highest_expense_amount = highest_surplus_amount = highest_investment_amount = lowest_expense_amount = 0
-            top_expense_category = 'Unknown'
+    # Find highest/lowest months with one pass over the summary columns
+    if not summary_df.empty:
+        extreme_columns = ['Total Expenses', 'Surplus', 'Investments']
+        extreme_idx = summary_df[extreme_columns].agg(['idxmax', 'idxmin'])
+        extreme_vals = summary_df[extreme_columns].agg(['max', 'min'])
+        extreme_months = pd.DataFrame(
+            summary_df.loc[extreme_idx.to_numpy().ravel(), 'Month'].to_numpy().reshape(extreme_idx.shape),
+            index=extreme_idx.index,
+            columns=extreme_columns
+        )
+        
+        highest_expense_month = extreme_months.at['idxmax', 'Total Expenses']
+        highest_expense_amount = extreme_vals.at['max', 'Total Expenses']
+        highest_surplus_month = extreme_months.at['idxmax', 'Surplus']
+        highest_surplus_amount = extreme_vals.at['max', 'Surplus']
+        highest_investment_month = extreme_months.at['idxmax', 'Investments']
+        highest_investment_amount = extreme_vals.at['max', 'Investments']
+        lowest_expense_month = extreme_months.at['idxmin', 'Total Expenses']
+        lowest_expense_amount = extreme_vals.at['min', 'Total Expenses']
+        
+        # Months without expenses have no top category
+        top_expense_amounts = summary_df['Top Expense Amount'].to_numpy(dtype='float64', na_value=np.nan)
+        top_expense_category = summary_df['Top Expense Category'].iat[int(np.nanargmax(top_expense_amounts))] if np.isfinite(top_expense_amounts).any() else 'Unknown'
     else:
         highest_expense_month = highest_surplus_month = highest_investment_month = lowest_expense_month = 'Unknown'
         highest_expense_amount = highest_surplus_amount = highest_investment_amount = lowest_expense_amount = 0
@@ -247,13 +271,13 @@ def create_layout(summary_df, all_transactions_df, category_monthly_df, month_na
         ]),
         
         # File Upload Section
-        create_file_upload_section(),
+        create_file_upload_section(files_present),
         
         # Dashboard Content - only shown when files are available
-        html.Div(id="dashboard-content", style={'display': 'block' if has_excel_files() else 'none'}, children=[
+        html.Div(id="dashboard-content", style={'display': 'block' if files_present else 'none'}, children=[
         
             # Error message row - only visible when there are errors
-            create_error_container(),
+            create_error_container(errors if all_transactions_df.empty else []),
             
             # YTD Summary Cards
             create_ytd_summary_cards(ytd_income, ytd_expenses, ytd_investments, ytd_surplus),
@@ -310,19 +334,19 @@ def create_layout(summary_df, all_transactions_df, category_monthly_df, month_na
                     dbc.Row([
                         dbc.Col([
                             html.H4("Income, Expenses, and Investments by Month", className="text-center mt-4 mb-2"),
-                            dcc.Graph(id='monthly-overview-chart')
+                            dcc.Graph(id='monthly-overview-chart', figure=create_base_figure())
                         ], width=12),
                     ]),
                     
                     dbc.Row([
                         dbc.Col([
                             html.H4("Surplus by Month", className="text-center mt-4 mb-2"),
-                            dcc.Graph(id='monthly-surplus-chart')
+                            dcc.Graph(id='monthly-surplus-chart', figure=create_base_figure())
                         ], width=6),
                         
                         dbc.Col([
                             html.H4("Investments by Month", className="text-center mt-4 mb-2"),
-                            dcc.Graph(id='monthly-investments-chart')
+                            dcc.Graph(id='monthly-investments-chart', figure=create_base_figure())
                         ], width=6)
                     ])
                 ]),
@@ -335,11 +359,11 @@ def create_layout(summary_df, all_transactions_df, category_monthly_df, month_na
                             html.Div([
                                 dcc.Dropdown(
                                     id='month-dropdown',
-                                    options=[{'label': month, 'value': month} for month in month_names] if month_names else [],
+                                    options=month_options,
                                     value=month_names[0] if month_names else None,
                                     className="mb-2"
                                 ),
-                                dcc.Graph(id='category-pie-chart')
+                                dcc.Graph(id='category-pie-chart', figure=create_base_figure())
                             ])
                         ], width=6),
                         
@@ -348,7 +372,7 @@ def create_layout(summary_df, all_transactions_df, category_monthly_df, month_na
                             html.Div([
                                 dcc.Dropdown(
                                     id='category-dropdown',
-                                    options=[{'label': cat, 'value': cat} for cat in unique_categories] if unique_categories else [],
+                                    options=category_options,
                                     value=unique_categories[0] if unique_categories and len(unique_categories) > 0 else None,
                                     className="mb-2"
                                 ),
@@ -360,7 +384,10 @@ def create_layout(summary_df, all_transactions_df, category_monthly_df, month_na
                     dbc.Row([
                         dbc.Col([
                             html.H4("Top Expense Categories (Overall)", className="text-center mt-4 mb-2"),
-                            dcc.Graph(id='top-categories-chart')
+                            dcc.Graph(
+                                id='top-categories-chart',
+                                figure=create_base_figure(xaxis_title='Category', yaxis_title='Amount (₹)')
+                            )
                         ], width=12)
                     ])
                 ]),
@@ -375,8 +402,7 @@ def create_layout(summary_df, all_transactions_df, category_monthly_df, month_na
                                     html.Label("Month:"),
                                     dcc.Dropdown(
                                         id='transaction-month-dropdown',
-                                        options=[{'label': 'All Months', 'value': 'all'}] + 
-                                                ([{'label': month, 'value': month} for month in month_names] if month_names else []),
+                                        options=all_month_options,
                                         value='all',
                                         className="mb-2"
                                     )
@@ -385,8 +411,7 @@ def create_layout(summary_df, all_transactions_df, category_monthly_df, month_na
                                     html.Label("Category:"),
                                     dcc.Dropdown(
                                         id='transaction-category-dropdown',
-                                        options=[{'label': 'All Categories', 'value': 'all'}] + 
-                                                ([{'label': cat, 'value': cat} for cat in unique_categories] if unique_categories else []),
+                                        options=all_category_options,
                                         value='all',
                                         className="mb-2"
                                     )
@@ -395,8 +420,7 @@ def create_layout(summary_df, all_transactions_df, category_monthly_df, month_na
                                     html.Label("Person:"),
                                     dcc.Dropdown(
                                         id='transaction-person-dropdown',
-                                        options=[{'label': 'All People', 'value': 'all'}] + 
-                                                ([{'label': person, 'value': person} for person in unique_people] if unique_people else []),
+                                        options=all_people_options,
                                         value='all',
                                         className="mb-2"
                                     )
@@ -427,8 +451,7 @@ def create_layout(summary_df, all_transactions_df, category_monthly_df, month_na
                                     html.Label("Filter by Month:"),
                                     dcc.Dropdown(
                                         id='label-month-dropdown',
-                                        options=[{'label': 'All Months', 'value': 'all'}] + 
-                                                ([{'label': month, 'value': month} for month in month_names] if month_names else []),
+                                        options=all_month_options,
                                         value='all',
                                         className="mb-2"
                                     )
@@ -439,7 +462,7 @@ def create_layout(summary_df, all_transactions_df, category_monthly_df, month_na
                                     html.Label("Bulk Label by Category:"),
                                     dcc.Dropdown(
                                         id='bulk-category-dropdown',
-                                        options=[{'label': cat, 'value': cat} for cat in unique_categories] if unique_categories else [],
+                                        options=category_options,
                                         value=None,
                                         className="mb-2"
                                     )
@@ -468,7 +491,8 @@ def create_layout(summary_df, all_transactions_df, category_monthly_df, month_na
                                     {"name": "Who", "id": "Who"},
                                     {"name": "Label", "id": "Label", "presentation": "dropdown", "editable": True},
                                 ],
-                                data=all_transactions_df.to_dict('records'),
+                                # Filled from transactions-store by a clientside callback on page load
+                                data=[],
                                 dropdown={
                                     'Label': {
                                         'options': label_options
@@ -618,5 +642,16 @@ def create_layout(summary_df, all_transactions_df, category_monthly_df, month_na
         ]), # End of dashboard-content div
         
         # Store component to keep track of the labeled transactions
-        dcc.Store(id='transactions-store', data=all_transactions_df.to_dict('records'))
+        dcc.Store(id='transactions-store', data=transactions_to_store(all_transactions_df)),
+        
+        # Store component with the monthly summary used by the monthly charts
+        dcc.Store(id='summary-store', data=summary_df.to_dict('records')),
+        
+        # Store component with the data signature each store-driven chart was
+        # last drawn from in this browser tab (see chart_data_unchanged)
+        dcc.Store(id='chart-signatures-store', storage_type='memory'),
+        
+        # Store component with the dashboard visibility and card values set
+        # by refresh and upload
+        dcc.Store(id='dashboard-state')
     ], fluid=True)
\ No newline at end of file
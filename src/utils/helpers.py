@@ -2,19 +2,27 @@
 Helper functions for the budget dashboard application
 """
 import os
+import shutil
 import sys
 import argparse
+import logging
+from functools import lru_cache
 from datetime import datetime
 
-def get_data_dir():
-    """Get the data directory path"""
+# Root of the application (the directory containing src) and its templates
+APP_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TEMPLATES_DIR = os.path.join(APP_DIR, 'templates')
+
+@lru_cache(maxsize=None)
+def _resolve_data_dir():
+    """Work out the data directory from the command line or the app location"""
     # If running as a script directly
     if getattr(sys, 'frozen', False):
         # Running as compiled executable
         app_path = os.path.dirname(sys.executable)
     else:
         # Running as script
-        app_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        app_path = APP_DIR
     
     # Check for command line arguments
     parser = argparse.ArgumentParser(description='Budget Dashboard')
@@ -22,49 +30,79 @@ def get_data_dir():
     args, _ = parser.parse_known_args()
     
     if args.data_dir:
-        data_dir = os.path.abspath(args.data_dir)
-        # Create directory if it doesn't exist
-        if not os.path.exists(data_dir):
-            os.makedirs(data_dir)
-        return data_dir
+        return os.path.abspath(args.data_dir), False
     
     # Default data directory is inside the app directory
-    default_data_dir = os.path.join(app_path, 'data')
+    return os.path.join(app_path, 'data'), True
+
+def get_data_dir():
+    """
+    Get the data directory path, creating the directory if needed
+    
+    The command line is only parsed on the first call; the directory is
+    checked every time so it is recreated if removed while running.
+    """
+    data_dir, is_default = _resolve_data_dir()
     
     # Create data directory if it doesn't exist
-    if not os.path.exists(default_data_dir):
-        os.makedirs(default_data_dir)
-        print(f"Created data directory at {default_data_dir}")
+    if not os.path.exists(data_dir):
+        os.makedirs(data_dir)
+        if is_default:
+            print(f"Created data directory at {data_dir}")
     
-    return default_data_dir
+    return data_dir
+
+def configure_logging(level=logging.INFO):
+    """Print log messages of the given level and above to the console"""
+    logging.basicConfig(level=level, format='%(message)s')
 
 def format_inr(value):
     """Format a number as Indian Rupees"""
     return f"₹{value:,.2f}"
 
+# Template paths found by get_template_path, keyed by filename
+_template_paths = {}
+
 def get_template_path(filename):
-    """Get the path to a template file"""
-    # Check if file exists in the templates directory
-    app_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    templates_dir = os.path.join(app_path, 'templates')
+    """
+    Get the path to a template file, or None if it doesn't exist
     
+    Found paths are cached per filename. Misses are not, so a template added
+    later is picked up on the next call.
+    """
+    template_path = _template_paths.get(filename)
+    if template_path is None:
+        template_path = _find_template_path(filename)
+        if template_path is not None:
+            _template_paths[filename] = template_path
+    return template_path
+
+def _find_template_path(filename):
+    """Look up a template file in the templates and data directories"""
     # If templates directory doesn't exist, create it
-    if not os.path.exists(templates_dir):
-        os.makedirs(templates_dir)
-        
-    template_path = os.path.join(templates_dir, filename)
+    if not os.path.exists(TEMPLATES_DIR):
+        os.makedirs(TEMPLATES_DIR)
+    
+    # Check if file exists in the templates directory
+    template_path = os.path.join(TEMPLATES_DIR, filename)
     
     # If the template doesn't exist in templates dir, check data dir
     if not os.path.exists(template_path):
         data_dir = get_data_dir()
         data_template_path = os.path.join(data_dir, filename)
         
-        # If it exists in data dir, move it to templates dir
+        # If it exists in data dir, make it available in templates dir
         if os.path.exists(data_template_path):
-            # Copy it to templates dir
-            import shutil
-            shutil.copy2(data_template_path, template_path)
-            print(f"Moved template {filename} to templates directory")
+            # Hard link it into templates dir, copying only if the two
+            # directories are on different filesystems or links aren't supported.
+            # A linked template is the same file as the one in the data
+            # directory, so editing either changes the template that is served.
+            try:
+                os.link(data_template_path, template_path)
+                print(f"Linked template {filename} into templates directory")
+            except OSError:
+                shutil.copy2(data_template_path, template_path)
+                print(f"Copied template {filename} to templates directory")
             return template_path
         else:
             # Template doesn't exist anywhere
@@ -4,11 +4,29 @@ This script creates a template Excel file with sample data
 to guide users on how to format their own budget data.
 """
 
+import io
 import os
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import random
 
+def write_template(path, summary_df, transactions_df):
+    """Write the Summary and Transactions sheets to an Excel file in one write."""
+    # Build the workbook in memory so the file is written in one call
+    # instead of openpyxl's many small zip writes
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        # Write summary sheet with instructions
+        summary_df.to_excel(writer, sheet_name='Summary', index=False)
+        
+        # Write transactions sheet
+        transactions_df.to_excel(writer, sheet_name='Transactions', index=False)
+    
+    with open(path, 'wb') as f:
+        f.write(buffer.getbuffer())
+
 def create_template_excel():
     """Create a template Excel file with sample data."""
     # Define the output directory and file path
@@ -30,96 +48,82 @@ def create_template_excel():
     dates = [start_date + timedelta(days=i) for i in range(30)]
     
     # Sample categories
-    expense_categories = [
+    expense_categories = (
         'Housing', 'Utilities', 'Groceries', 'Dining Out', 'Transportation',
         'Health', 'Entertainment', 'Shopping', 'Education', 'Personal Care',
         'Insurance', 'Debt Payments', 'Subscriptions', 'Gifts & Donations'
-    ]
+    )
     
-    investment_categories = [
+    investment_categories = (
         'Investment: Stocks', 'Investment: Mutual Funds', 'Investment: Fixed Deposit', 
         'Investment: Gold', 'Investment: Retirement'
-    ]
+    )
     
     # Sample people
-    people = ['Self', 'Spouse', 'Family']
+    people = ('Self', 'Spouse', 'Family')
     
     # Sample vendors
-    vendors = [
+    vendors = (
         'Local Grocery Store', 'Supermarket', 'Restaurant', 'Cafe', 'Gas Station',
         'Electric Company', 'Internet Provider', 'Mobile Provider', 'Pharmacy',
         'Department Store', 'Online Shop', 'Cinema', 'Gym', 'Bank', 'Insurance Company'
-    ]
+    )
     
     # Sample labels (Needs, Wants, Luxury)
-    labels = ['N', 'W', 'L', 'S', 'I']
+    labels = ('N', 'W', 'L', 'S', 'I')
     
     # Sample descriptions
     descriptions = {
-        'Housing': ['Rent Payment', 'Maintenance', 'Property Tax'],
-        'Utilities': ['Electricity Bill', 'Water Bill', 'Internet Bill', 'Mobile Bill'],
-        'Groceries': ['Weekly Groceries', 'Fresh Produce', 'Household Supplies'],
-        'Dining Out': ['Lunch with Colleagues', 'Dinner', 'Coffee', 'Restaurant'],
-        'Transportation': ['Fuel', 'Bus Fare', 'Taxi', 'Vehicle Maintenance'],
-        'Health': ['Doctor Visit', 'Medications', 'Health Insurance', 'Gym Membership'],
-        'Entertainment': ['Movie Tickets', 'Streaming Service', 'Concert', 'Books'],
-        'Shopping': ['Clothes', 'Electronics', 'Home Decor', 'Gifts'],
-        'Education': ['Course Fee', 'Books', 'Online Class', 'School Supplies'],
-        'Personal Care': ['Haircut', 'Skincare Products', 'Salon Visit'],
-        'Insurance': ['Life Insurance', 'Vehicle Insurance', 'Home Insurance'],
-        'Debt Payments': ['Credit Card Payment', 'Loan EMI', 'Interest Payment'],
-        'Subscriptions': ['Streaming Service', 'Magazine', 'Software Subscription'],
-        'Gifts & Donations': ['Birthday Gift', 'Charity Donation', 'Festival Gift']
+        'Housing': ('Rent Payment', 'Maintenance', 'Property Tax'),
+        'Utilities': ('Electricity Bill', 'Water Bill', 'Internet Bill', 'Mobile Bill'),
+        'Groceries': ('Weekly Groceries', 'Fresh Produce', 'Household Supplies'),
+        'Dining Out': ('Lunch with Colleagues', 'Dinner', 'Coffee', 'Restaurant'),
+        'Transportation': ('Fuel', 'Bus Fare', 'Taxi', 'Vehicle Maintenance'),
+        'Health': ('Doctor Visit', 'Medications', 'Health Insurance', 'Gym Membership'),
+        'Entertainment': ('Movie Tickets', 'Streaming Service', 'Concert', 'Books'),
+        'Shopping': ('Clothes', 'Electronics', 'Home Decor', 'Gifts'),
+        'Education': ('Course Fee', 'Books', 'Online Class', 'School Supplies'),
+        'Personal Care': ('Haircut', 'Skincare Products', 'Salon Visit'),
+        'Insurance': ('Life Insurance', 'Vehicle Insurance', 'Home Insurance'),
+        'Debt Payments': ('Credit Card Payment', 'Loan EMI', 'Interest Payment'),
+        'Subscriptions': ('Streaming Service', 'Magazine', 'Software Subscription'),
+        'Gifts & Donations': ('Birthday Gift', 'Charity Donation', 'Festival Gift')
     }
     
-    # Generate random transactions
-    transactions = []
+    # Generate random transactions, drawing each column in one call
+    rng = np.random.default_rng()
+    regular_count = 40  # 40 regular transactions
+    investment_count = 5  # 5 investment transactions
+    
+    # Descriptions for each expense category, in the same order as expense_categories
+    description_table = tuple(descriptions.get(category, (f"{category} expense",)) for category in expense_categories)
     
     # Regular expenses
-    for _ in range(40):  # 40 regular transactions
-        date = random.choice(dates)
-        category = random.choice(expense_categories)
-        description = random.choice(descriptions.get(category, [f"{category} expense"]))
-        amount = round(random.uniform(100, 5000), 2)  # Random amount between 100 and 5000
-        who = random.choice(people)
-        whom = random.choice(vendors)
-        label = random.choice(['N', 'W', 'L'])  # Assign N, W, or L randomly
-        
-        transactions.append({
-            'Date': date,
-            'Amount': amount,
-            'Description': description,
-            'Category': category,
-            'Who': who,
-            'Whom': whom,
-            'Label': label
-        })
+    expense_indices = random.choices(range(len(expense_categories)), k=regular_count)
+    expense_picks = [expense_categories[i] for i in expense_indices]
+    regular_descriptions = [random.choice(description_table[i]) for i in expense_indices]
+    regular_amounts = np.round(rng.uniform(100, 5000, size=regular_count), 2).tolist()  # Random amount between 100 and 5000
+    regular_labels = random.choices(('N', 'W', 'L'), k=regular_count)  # Assign N, W, or L randomly
     
     # Investment transactions
-    for _ in range(5):  # 5 investment transactions
-        date = random.choice(dates)
-        category = random.choice(investment_categories)
-        description = f"{category.replace('Investment: ', '')} Contribution"
-        amount = round(random.uniform(5000, 50000), 2)  # Higher amounts for investments
-        who = random.choice(people)
-        whom = 'Investment Platform'
-        label = 'I'  # Investment label
-        
-        transactions.append({
-            'Date': date,
-            'Amount': amount,
-            'Description': description,
-            'Category': category,
-            'Who': who,
-            'Whom': whom,
-            'Label': label
-        })
-    
-    # Create DataFrame
-    transactions_df = pd.DataFrame(transactions)
+    investment_picks = random.choices(investment_categories, k=investment_count)
+    investment_descriptions = [f"{category.replace('Investment: ', '')} Contribution" for category in investment_picks]
+    investment_amounts = np.round(rng.uniform(5000, 50000, size=investment_count), 2).tolist()  # Higher amounts for investments
+    
+    # Create DataFrame from the columns
+    total_count = regular_count + investment_count
+    transactions_df = pd.DataFrame({
+        'Date': random.choices(dates, k=total_count),
+        'Amount': regular_amounts + investment_amounts,
+        'Description': regular_descriptions + investment_descriptions,
+        'Category': expense_picks + investment_picks,
+        'Who': random.choices(people, k=total_count),
+        'Whom': random.choices(vendors, k=regular_count) + ['Investment Platform'] * investment_count,
+        'Label': regular_labels + ['I'] * investment_count  # Investment label
+    })
     
     # Sort by date
-    transactions_df = transactions_df.sort_values('Date')
+    transactions_df = transactions_df.sort_values('Date', kind='stable')
     
     # Create a summary sheet with instructions
     summary_data = {
@@ -147,31 +151,22 @@ def create_template_excel():
     
     summary_df = pd.DataFrame(summary_data)
     
-    # Create a new Excel writer
-    with pd.ExcelWriter(template_path, engine='openpyxl') as writer:
-        # Write summary sheet with instructions
-        summary_df.to_excel(writer, sheet_name='Summary', index=False)
-        
-        # Write transactions sheet
-        transactions_df.to_excel(writer, sheet_name='Transactions', index=False)
-    
-    print(f"Template Excel file created at: {template_path}")
-    
     # Also create a blank template without data
     blank_template_path = os.path.join(output_dir, 'BlankTemplate.xlsx')
     
     # Create blank transactions DataFrame with correct column structure
     blank_df = pd.DataFrame(columns=['Date', 'Amount', 'Description', 'Category', 'Who', 'Whom', 'Label'])
     
-    # Create a new Excel writer for blank template
-    with pd.ExcelWriter(blank_template_path, engine='openpyxl') as writer:
-        # Write summary sheet with instructions
-        summary_df.to_excel(writer, sheet_name='Summary', index=False)
+    # Write both templates at the same time; result() re-raises any write error
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        template_write = executor.submit(write_template, template_path, summary_df, transactions_df)
+        blank_template_write = executor.submit(write_template, blank_template_path, summary_df, blank_df)
         
-        # Write blank transactions sheet
-        blank_df.to_excel(writer, sheet_name='Transactions', index=False)
-    
-    print(f"Blank template Excel file created at: {blank_template_path}")
+        template_write.result()
+        print(f"Template Excel file created at: {template_path}")
+        
+        blank_template_write.result()
+        print(f"Blank template Excel file created at: {blank_template_path}")
     
     return template_path, blank_template_path
 